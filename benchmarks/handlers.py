@@ -0,0 +1,320 @@
+"""Benchmarks de los handlers de estado y sus consultas.
+
+Mide los caminos calientes de la tabla en modo snapshot
+(``TableState._get_filtered_ids``, ``_get_sorted_ids``,
+``get_current_page`` y el tiempo hasta la primera página del snapshot) a
+varias escalas, y los siete loaders de ``StatsState`` contra la base de
+``DATABASE_URL``, normalmente una base local generada con
+``benchmarks/synthetic.py``::
+
+    python -m benchmarks.synthetic --facts 1m --replace --rollups
+    python -m benchmarks.handlers --rows 1k,10k,50k             # compara con la línea base
+    python -m benchmarks.handlers --rows 1k,10k,50k --save      # la reescribe
+
+Por cada caso informa latencia p50/p95, memoria (pico de tracemalloc en
+una corrida aparte, para no inflar los tiempos) y el tamaño en bytes del
+delta de estado serializado que recibiría el navegador. Con una línea base
+guardada (``benchmarks/baselines.json``) termina con código 1 si algún
+caso la supera en más de ``--tolerance``. Con ``--profile`` también
+informa el tamaño de cada var del estado (backend/state_profile.py) y falla
+si alguna supera su presupuesto.
+
+Los loaders corren con la caché de consultas vacía en cada iteración, para
+medir el camino a la base; ``--warm`` la conserva.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import numpy as np
+
+BASELINE_PATH = Path(__file__).with_name("baselines.json")
+
+LOADERS = (
+    "load_line_chart",
+    "load_temporal_chart",
+    "load_pie_chart",
+    "load_sales_by_year",
+    "load_sales_by_month",
+    "load_kpi_data",
+    "load_sales_by_seller",
+)
+
+# Debajo de esto una diferencia de latencia es ruido del reloj.
+_NOISE_MS = 1.0
+
+
+def delta_size(state, case: str, profiler=None) -> int:
+    """Bytes del delta pendiente del estado, serializado como lo envía Reflex.
+
+    Con ``profiler`` (``--profile``) además se mide cada var del delta y
+    cada var de backend del estado.
+    """
+    from reflex.utils import format
+
+    from nuevo_intento.backend.state_profile import backend_var_sizes
+
+    delta = state.get_delta()
+    if profiler is not None:
+        profiler.observe("benchmark", case, delta, backend_var_sizes(state))
+    return len(format.json_dumps(delta).encode())
+
+
+async def measure(
+    name: str,
+    run: Callable[[], Awaitable | object],
+    repeat: int,
+    setup: Callable[[], Awaitable | object] | None = None,
+) -> dict:
+    """Latencias de ``run`` en ``repeat`` iteraciones y su pico de memoria.
+
+    ``setup`` corre antes de cada iteración, fuera de la medición.
+    """
+
+    async def call(fn):
+        if fn is not None and inspect.isawaitable(result := fn()):
+            await result
+
+    timings = []
+    for _ in range(repeat):
+        await call(setup)
+        started = time.perf_counter()
+        await call(run)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    await call(setup)
+    tracemalloc.start()
+    await call(run)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "name": name,
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "alloc_kb": peak / 1024,
+    }
+
+
+async def snapshot_store(pool, rows: int):
+    """Las primeras ``rows`` filas de la tabla, como las carga el snapshot."""
+    from nuevo_intento.backend.columns import ColumnStore
+    from nuevo_intento.backend.queries import SNAPSHOT
+    from nuevo_intento.backend.table_state import SalesItem, _row_to_item
+
+    async with pool.acquire() as conn:
+        records = await conn.fetch(SNAPSHOT.sql, *SNAPSHOT.bind((rows,)))
+    store = ColumnStore(SalesItem)
+    store.append(_row_to_item(r) for r in records)
+    return store
+
+
+async def table_cases(
+    pool, rows: int, repeat: int, search: str, sort: str, profiler=None
+) -> list[dict]:
+    from nuevo_intento.backend import table_state
+    from nuevo_intento.backend.table_state import TableState
+
+    # Los casos miden el modo snapshot, sea cual sea TABLE_SERVER_SIDE.
+    table_state.SERVER_SIDE = False
+    store = await snapshot_store(pool, rows)
+    snapshot = table_state.publish_snapshot(store, table_state.build_indexes(store))
+    state = TableState(_reflex_internal_init=True)
+    state._snapshot_version = snapshot.version
+    size = len(store)
+    current_page = TableState.computed_vars["get_current_page"].fget
+    results = []
+
+    def reset():
+        state.search_value = ""
+        state.sort_value = ""
+        state.sort_reverse = False
+        state.offset = 0
+        table_state._pipelines.clear()
+        current_page(state)
+        state._clean()
+
+    # Cada caso se acompaña del delta que produce el cambio de estado que lo
+    # dispara: buscar, ordenar o pasar de página.
+    reset()
+    state.search_value = search
+    result = await measure(
+        f"table.filter[{size}]", lambda: state._get_filtered_ids(snapshot), repeat
+    )
+    results.append({**result, "delta_bytes": delta_size(state, result["name"], profiler)})
+
+    # Se ordena el subconjunto que deja la búsqueda: con todas las filas
+    # SortIndex devuelve la permutación ya calculada y no mide nada.
+    reset()
+    state.search_value = search
+    ids = state._get_filtered_ids(snapshot)
+    reset()
+    state.sort_value, state.sort_reverse = sort, True
+    result = await measure(
+        f"table.sort[{size}]", lambda: state._get_sorted_ids(snapshot, ids), repeat
+    )
+    results.append({**result, "delta_bytes": delta_size(state, result["name"], profiler)})
+
+    reset()
+    state.search_value, state.sort_value = search, sort
+    current_page(state)
+    state._clean()
+    state.offset = state.limit
+
+    def forget_pipeline():
+        table_state._pipelines.clear()
+
+    result = await measure(
+        f"table.page[{size}]", lambda: current_page(state), repeat, setup=forget_pipeline
+    )
+    results.append({**result, "delta_bytes": delta_size(state, result["name"], profiler)})
+
+    # Tiempo hasta la primera página publicada: con SNAPSHOT_LIMIT = rows
+    # debe quedar plano, porque no espera el resto de la lectura.
+    table_state.SNAPSHOT_LIMIT = rows
+    loads = []
+
+    async def cancel_load():
+        while loads:
+            task = loads.pop().task
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def first_page():
+        loads.append(table_state._SnapshotLoad())
+        await loads[-1].first
+
+    result = await measure(f"table.first_page[{size}]", first_page, repeat, setup=cancel_load)
+    await cancel_load()
+    state._clean()
+    results.append({**result, "delta_bytes": 0})
+    return results
+
+
+async def loader_cases(repeat: int, warm: bool, profiler=None) -> list[dict]:
+    from nuevo_intento.backend.cache import query_cache
+    from nuevo_intento.views.charts import StatsState
+
+    state = StatsState(_reflex_internal_init=True)
+    results = []
+    for name in LOADERS:
+        handler = StatsState.event_handlers[name].fn
+
+        async def setup():
+            if not warm:
+                await query_cache.invalidate()
+            state._clean()
+
+        result = await measure(f"stats.{name}", lambda: handler(state), repeat, setup=setup)
+        results.append({**result, "delta_bytes": delta_size(state, result["name"], profiler)})
+        state._clean()
+    return results
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    """Casos que empeoraron respecto de la línea base."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result["name"])
+        if base is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "alloc_kb", "delta_bytes"):
+            value, limit = result[metric], base[metric] * (1 + tolerance)
+            if metric.endswith("_ms"):
+                limit = max(limit, base[metric] + _NOISE_MS)
+            if value > limit:
+                regressions.append(
+                    f"{result['name']} {metric}: {value:.2f} > {base[metric]:.2f}"
+                )
+    return regressions
+
+
+def report(results: list[dict]):
+    print(f"{'caso':<32} {'p50 ms':>9} {'p95 ms':>9} {'alloc KB':>10} {'delta B':>9}")
+    for r in results:
+        print(
+            f"{r['name']:<32} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+            f"{r['alloc_kb']:>10.1f} {r['delta_bytes']:>9}"
+        )
+
+
+async def run(args: argparse.Namespace) -> int:
+    from nuevo_intento.backend.db import close_pools, get_pool
+    from nuevo_intento.backend.rollups import check_rollups
+    from nuevo_intento.backend.state_profile import StateProfiler, print_report
+    from .synthetic import parse_count
+
+    profiler = StateProfiler() if args.profile else None
+    pool = await get_pool()
+    try:
+        # Como el lifespan de la app: los loaders usan las tablas derivadas
+        # sólo si están al día.
+        await check_rollups(pool)
+        facts = await pool.fetchval("SELECT COUNT(*) FROM gold.fact_sales")
+        print(f"📊 {facts:,} hechos en la base de prueba")
+        results = []
+        for rows in args.rows.split(","):
+            results += await table_cases(
+                pool, parse_count(rows), args.repeat, args.search, args.sort, profiler
+            )
+        if not args.skip_loaders:
+            results += await loader_cases(args.repeat, args.warm, profiler)
+    finally:
+        await close_pools()
+    report(results)
+    if profiler is not None:
+        print()
+        print_report(profiler.report())
+
+    baseline_path = Path(args.baseline)
+    if args.save:
+        baseline_path.write_text(json.dumps({
+            "meta": {
+                "facts": facts,
+                "repeat": args.repeat,
+                "warm": args.warm,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+            },
+            "cases": {
+                r["name"]: {k: round(v, 3) for k, v in r.items() if k != "name"} for r in results
+            },
+        }, indent=2) + "\n")
+        print(f"✅ Línea base guardada en {baseline_path}")
+        return 0
+
+    regressions = list(profiler.violations) if profiler is not None else []
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        if baseline["meta"]["facts"] != facts:
+            print(f"⚠️ La línea base se tomó con {baseline['meta']['facts']:,} hechos")
+        regressions += compare(results, baseline["cases"], args.tolerance)
+    else:
+        print("⚠️ No hay línea base; corre con --save para crearla")
+    for line in regressions:
+        print(f"❌ {line}")
+    if not regressions:
+        print("✅ Sin regresiones respecto de la línea base")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de los handlers del dashboard.")
+    parser.add_argument("--rows", default="1k,10k", help="filas del snapshot de la tabla, separadas por coma")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--search", default="sao", help="texto de búsqueda de los casos de la tabla")
+    parser.add_argument("--sort", default="total", help="columna de orden de los casos de la tabla")
+    parser.add_argument("--warm", action="store_true", help="no vaciar la caché de consultas entre iteraciones")
+    parser.add_argument("--skip-loaders", action="store_true", help="sólo los casos de la tabla")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save", action="store_true", help="guarda los resultados como línea base")
+    parser.add_argument("--profile", action="store_true", help="tamaño por var del estado y presupuestos (STATE_VAR_BUDGET)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="margen relativo antes de marcar regresión")
+    raise SystemExit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,561 @@
+"""Prueba de carga con sesiones Reflex concurrentes.
+
+Simula N navegadores contra el backend: cada sesión abre su websocket
+(``/_event``), hidrata el estado y recorre las páginas de ``ALL_PAGES``
+(``/``, ``/ventas_temporal``, ``/vendedores`` y ``/table`` por defecto)
+disparando sus ``on_load`` y los filtros que usaría una persona
+(``set_selected_tab``, ``set_daily_chart_month``, ``set_month_chart_year``,
+``set_seller_chart_year``, ``next_page``), con pausas aleatorias entre
+acciones. Los eventos que el servidor devuelve (los loaders de cada
+página, por ejemplo) se reenvían de a uno, como hace el cliente de Reflex.
+
+Sin ``--url`` levanta su propio backend (``reflex run --backend-only``)
+contra ``DATABASE_URL``, que debe ser local, normalmente una base
+generada con ``benchmarks/synthetic.py``, y con ``METRICS_ENABLED=1``::
+
+    python -m benchmarks.synthetic --facts 1m --replace --rollups
+    python -m benchmarks.loadtest --sessions 10,50,100,200 --duration 60
+
+Por cada nivel de sesiones informa acciones por segundo, latencia
+p50/p95/p99 de cada acción (desde el clic hasta que llega el dato que
+espera la vista), tasa de errores (timeouts, desconexiones y errores del
+backend) y, leyendo ``/metrics``, la saturación del pool: conexiones
+abiertas, libres, fracción del tiempo sin conexiones libres y espera de
+``acquire``. Sube de nivel hasta que uno supera ``--max-p95`` o
+``--max-errors``; ese es el punto en que el diseño actual se cae.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import deque
+
+import numpy as np
+from simple_websocket import AioClient, ConnectionClosed
+
+DEFAULT_ROUTES = ("/", "/ventas_temporal", "/vendedores", "/table")
+
+_VAR_SUFFIX = "_rx_state_"
+_YEARS = ["All", "2016", "2017", "2018"]
+_MONTHS = ["All"] + [str(i).zfill(2) for i in range(1, 13)]
+_TABS = ["estado", "ciudad", "categoria"]
+
+# Engine.IO v4 / Socket.IO v5 sobre el namespace de eventos de Reflex.
+_NAMESPACE = "/_event"
+_EVENT_PREFIX = f"42{_NAMESPACE},"
+
+
+class SessionError(Exception):
+    """Timeout, desconexión o error informado por el backend."""
+
+
+def _state_names() -> dict[str, str]:
+    from reflex.state import OnLoadInternalState, State
+
+    from nuevo_intento.backend.table_state import TableState
+    from nuevo_intento.views.charts import StatsState
+
+    return {
+        "root": State.get_full_name(),
+        "on_load": OnLoadInternalState.get_full_name(),
+        "stats": StatsState.get_full_name(),
+        "table": TableState.get_full_name(),
+    }
+
+
+def page_actions(names: dict[str, str]) -> dict[str, list]:
+    """Acciones de cada página: (etiqueta, eventos, var que debe llegar).
+
+    Los eventos son los mismos que envían los controles de la vista; la
+    acción termina cuando se procesaron y, si hay var, cuando llega en un
+    delta (las recargas de gráficos corren en segundo plano con debounce).
+    """
+    stats, table = names["stats"], names["table"]
+    return {
+        "/": [
+            lambda rng: (
+                "StatsState.set_selected_tab",
+                [(f"{stats}.set_selected_tab", {"tab": rng.choice(_TABS)}),
+                 (f"{stats}.load_line_chart", {})],
+                "line_data",
+            ),
+        ],
+        "/ventas_temporal": [
+            lambda rng: (
+                "StatsState.set_daily_chart_month",
+                [(f"{stats}.set_daily_chart_month", {"value": rng.choice(_MONTHS)})],
+                "temporal_data",
+            ),
+            lambda rng: (
+                "StatsState.set_month_chart_year",
+                [(f"{stats}.set_month_chart_year", {"value": rng.choice(_YEARS)})],
+                "sales_by_month_data",
+            ),
+        ],
+        "/vendedores": [
+            lambda rng: (
+                "StatsState.set_seller_chart_year",
+                [(f"{stats}.set_seller_chart_year", {"value": rng.choice(_YEARS)})],
+                "seller_data",
+            ),
+        ],
+        "/table": [
+            lambda rng: ("TableState.next_page", [(f"{table}.next_page", {})], None),
+        ],
+    }
+
+
+class Stats:
+    """Resultados de un nivel de carga."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.events = 0
+        self.bytes_received = 0
+
+    def add(self, label: str, elapsed_ms: float):
+        self.latencies.setdefault(label, []).append(elapsed_ms)
+
+    def error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    @property
+    def completed(self) -> int:
+        return sum(len(values) for values in self.latencies.values())
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values())
+
+
+class Session:
+    """Un navegador: un websocket, un token y la cola de eventos del cliente."""
+
+    def __init__(self, base_url: str, names: dict[str, str], stats: Stats, timeout: float):
+        self.url = re.sub(r"^http", "ws", base_url.rstrip("/"))
+        self.names = names
+        self.stats = stats
+        self.timeout = timeout
+        self.token = str(uuid.uuid4())
+        self.path = "/"
+        self._ws: AioClient | None = None
+        self._reader: asyncio.Task | None = None
+        self._queue: deque = deque()
+        self._acked = asyncio.Event()
+        self._changed = asyncio.Event()
+        self._seen: set[str] = set()
+        self._failure: str | None = None
+
+    async def connect(self):
+        self._ws = await AioClient.connect(
+            f"{self.url}{_NAMESPACE}/?EIO=4&transport=websocket&token={self.token}"
+        )
+        opened = await asyncio.wait_for(self._ws.receive(), self.timeout)
+        if not opened.startswith("0"):
+            raise SessionError(f"apertura inesperada: {opened[:40]}")
+        await self._ws.send(f"40{_NAMESPACE},")
+        while (joined := await asyncio.wait_for(self._ws.receive(), self.timeout)) == "2":
+            await self._ws.send("3")
+        if not joined.startswith(f"40{_NAMESPACE}"):
+            raise SessionError(f"namespace rechazado: {joined[:40]}")
+        self._reader = asyncio.create_task(self._read())
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._ws is not None:
+            try:
+                await self._ws.close()
+            except Exception:
+                pass
+
+    async def _read(self):
+        try:
+            while True:
+                message = await self._ws.receive()
+                if message == "2":
+                    await self._ws.send("3")
+                elif message.startswith(_EVENT_PREFIX):
+                    self.stats.bytes_received += len(message)
+                    name, update = json.loads(message[len(_EVENT_PREFIX):])[:2]
+                    if name == "event":
+                        self._on_update(update)
+                elif message.startswith(f"41{_NAMESPACE}") or message == "1":
+                    self._fail("desconexión")
+                    return
+        except ConnectionClosed:
+            self._fail("desconexión")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail(type(e).__name__)
+
+    def _fail(self, kind: str):
+        self._failure = kind
+        self._acked.set()
+        self._changed.set()
+
+    def _on_update(self, update: dict):
+        for fields in (update.get("delta") or {}).values():
+            for field, value in fields.items():
+                name = field.removesuffix(_VAR_SUFFIX)
+                self._seen.add(name)
+                if name == "error_message" and value:
+                    self.stats.error("backend")
+        for event in update.get("events") or []:
+            if event["name"].startswith(self.names["root"]):
+                self._queue.append((event["name"], event.get("payload") or {}))
+            elif "backend_error" in json.dumps(event.get("payload")):
+                self.stats.error("backend")
+        if update.get("final"):
+            self._acked.set()
+        self._changed.set()
+
+    async def _send(self, name: str, payload: dict):
+        event = {
+            "token": self.token,
+            "name": name,
+            "router_data": {"pathname": self.path, "query": {}, "asPath": self.path},
+            "payload": payload,
+        }
+        self._acked.clear()
+        await self._ws.send(_EVENT_PREFIX + json.dumps(["event", event]))
+        self.stats.events += 1
+
+    async def _wait(self, waiter: asyncio.Event, deadline: float):
+        remaining = deadline - time.monotonic()
+        try:
+            await asyncio.wait_for(waiter.wait(), max(remaining, 0))
+        except asyncio.TimeoutError:
+            raise SessionError("timeout") from None
+        if self._failure:
+            raise SessionError(self._failure)
+
+    async def action(self, label: str, events: list[tuple[str, dict]], wait_for: str | None = None):
+        """Envía ``events`` y sus derivados de a uno, esperando el final de cada uno."""
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        self._seen.clear()
+        self._queue.extend(events)
+        while True:
+            while self._queue:
+                await self._send(*self._queue.popleft())
+                await self._wait(self._acked, deadline)
+            if wait_for is None or wait_for in self._seen:
+                break
+            self._changed.clear()
+            await self._wait(self._changed, deadline)
+        self.stats.add(label, (time.perf_counter() - started) * 1000)
+
+    async def navigate(self, path: str, hydrate: bool = False):
+        """Lo que hace el router del cliente al entrar a ``path``."""
+        self.path = path
+        events = [(f"{self.names['on_load']}.on_load_internal", {})]
+        if hydrate:
+            events.insert(0, (f"{self.names['root']}.hydrate", {}))
+        await self.action(f"GET {path}", events)
+
+
+async def run_session(
+    base_url: str,
+    names: dict[str, str],
+    routes: list[str],
+    stats: Stats,
+    stop: asyncio.Event,
+    rng: random.Random,
+    think: tuple[float, float],
+    timeout: float,
+):
+    """Navega hasta ``stop``; ante un error abre una sesión nueva."""
+    actions = page_actions(names)
+
+    async def pause():
+        try:
+            await asyncio.wait_for(stop.wait(), rng.uniform(*think))
+        except asyncio.TimeoutError:
+            pass
+
+    while not stop.is_set():
+        session = Session(base_url, names, stats, timeout)
+        try:
+            await session.connect()
+            hydrate = True
+            while not stop.is_set():
+                route = rng.choice(routes)
+                await session.navigate(route, hydrate)
+                hydrate = False
+                for _ in range(rng.randint(1, 4)):
+                    await pause()
+                    if stop.is_set() or not actions.get(route):
+                        break
+                    await session.action(*rng.choice(actions[route])(rng))
+                await pause()
+        except (SessionError, ConnectionClosed, OSError, asyncio.TimeoutError) as e:
+            stats.error(str(e) if isinstance(e, SessionError) else "conexión")
+            await pause()
+        finally:
+            await session.close()
+
+
+def parse_metrics(text: str) -> dict[str, float]:
+    """Series del formato de texto de Prometheus, como ``nombre{labels}``."""
+    series = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, _, value = line.rpartition(" ")
+            series[key] = float(value)
+    return series
+
+
+def _total(series: dict[str, float], name: str) -> float:
+    return sum(value for key, value in series.items() if key.split("{")[0] == name)
+
+
+def _bucket_quantile(before: dict, after: dict, name: str, q: float) -> float:
+    """Cuantil aproximado (límite del bucket) del histograma entre dos lecturas."""
+    buckets = {}
+    for key, value in after.items():
+        if key.startswith(f"{name}_bucket"):
+            le = re.search(r'le="([^"]+)"', key).group(1)
+            buckets[float(le)] = buckets.get(float(le), 0) + value - before.get(key, 0)
+    count = buckets.get(float("inf"), 0)
+    if not count:
+        return 0.0
+    for le in sorted(buckets):
+        if buckets[le] >= q * count:
+            return le
+    return float("inf")
+
+
+class MetricsProbe:
+    """Lee ``/metrics`` del backend durante un nivel para medir el pool."""
+
+    def __init__(self, base_url: str):
+        self.url = f"{base_url.rstrip('/')}/metrics"
+        self.available = True
+
+    async def scrape(self) -> dict[str, float] | None:
+        if not self.available:
+            return None
+        try:
+            text = await asyncio.to_thread(
+                lambda: urllib.request.urlopen(self.url, timeout=5).read().decode()
+            )
+        except (urllib.error.URLError, OSError) as e:
+            self.available = False
+            print(f"⚠️ Sin métricas en {self.url} ({e}); arranca el backend con METRICS_ENABLED=1")
+            return None
+        return parse_metrics(text)
+
+    async def sample(self, stop: asyncio.Event, interval: float, samples: list):
+        while not stop.is_set():
+            if (series := await self.scrape()) is None:
+                return
+            samples.append(series)
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def pool_summary(before: dict | None, after: dict | None, samples: list[dict]) -> dict:
+    if not before or not after or not samples:
+        return {}
+    sizes = [s.get("dashboard_db_pool_size", 0) for s in samples]
+    idle = [s.get("dashboard_db_pool_idle", 0) for s in samples]
+    acquires = _total(after, "dashboard_db_acquire_seconds_count") - _total(before, "dashboard_db_acquire_seconds_count")
+    waited = _total(after, "dashboard_db_acquire_seconds_sum") - _total(before, "dashboard_db_acquire_seconds_sum")
+    return {
+        "pool_max_size": max(sizes),
+        "pool_min_idle": min(idle),
+        "pool_saturated": sum(1 for value in idle if value == 0) / len(idle),
+        "acquire_mean_ms": waited / acquires * 1000 if acquires else 0.0,
+        "acquire_p95_ms": _bucket_quantile(before, after, "dashboard_db_acquire_seconds", 0.95) * 1000,
+        "queries": _total(after, "dashboard_db_query_seconds_count") - _total(before, "dashboard_db_query_seconds_count"),
+        "handler_errors": _total(after, "dashboard_event_errors_total") - _total(before, "dashboard_event_errors_total"),
+    }
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+
+async def run_level(args, names: dict[str, str], routes: list[str], sessions: int, probe: MetricsProbe) -> dict:
+    """Corre ``sessions`` sesiones durante ``--duration`` segundos."""
+    stats = Stats()
+    stop = asyncio.Event()
+    samples: list[dict] = []
+    before = await probe.scrape()
+    sampler = asyncio.create_task(probe.sample(stop, args.sample, samples))
+
+    tasks = []
+    for i in range(sessions):
+        rng = random.Random(args.seed * 100_003 + i)
+        tasks.append(asyncio.create_task(
+            run_session(args.url, names, routes, stats, stop, rng, args.think, args.timeout)
+        ))
+        # Las sesiones entran escalonadas a lo largo de --ramp segundos.
+        await asyncio.sleep(args.ramp / sessions)
+
+    started = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    elapsed = time.perf_counter() - started + args.ramp
+    # Las acciones en curso tienen hasta --timeout para terminar.
+    await asyncio.wait(tasks, timeout=args.timeout)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, sampler, return_exceptions=True)
+    after = await probe.scrape()
+
+    latencies = [value for values in stats.latencies.values() for value in values]
+    attempts = stats.completed + stats.failed
+    return {
+        "sessions": sessions,
+        "actions": stats.completed,
+        "actions_per_s": stats.completed / elapsed,
+        "events_per_s": stats.events / elapsed,
+        "kb_per_s": stats.bytes_received / 1024 / elapsed,
+        "errors": dict(stats.errors),
+        "error_rate": stats.failed / attempts if attempts else 0.0,
+        **_percentiles(latencies),
+        "by_action": {label: {"count": len(values), **_percentiles(values)} for label, values in sorted(stats.latencies.items())},
+        **pool_summary(before, after, samples),
+    }
+
+
+def report_level(level: dict):
+    print(
+        f"{level['sessions']:>8} {level['actions_per_s']:>9.1f} {level['p50_ms']:>9.0f} "
+        f"{level['p95_ms']:>9.0f} {level['p99_ms']:>9.0f} {level['error_rate']:>8.1%}",
+        end="",
+    )
+    if "pool_max_size" in level:
+        print(
+            f" {level['pool_max_size']:>5.0f} {level['pool_min_idle']:>5.0f} "
+            f"{level['pool_saturated']:>7.0%} {level['acquire_mean_ms']:>9.1f} {level['acquire_p95_ms']:>9.0f}",
+            end="",
+        )
+    print()
+
+
+def report_actions(level: dict):
+    print(f"\n📊 Acciones con {level['sessions']} sesiones")
+    print(f"{'acción':<36} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label, row in level["by_action"].items():
+        print(f"{label:<36} {row['count']:>6} {row['p50_ms']:>9.0f} {row['p95_ms']:>9.0f} {row['p99_ms']:>9.0f}")
+    if level["errors"]:
+        print("Errores: " + ", ".join(f"{kind} {n}" for kind, n in level["errors"].items()))
+
+
+def broken(level: dict, args) -> list[str]:
+    reasons = []
+    if level["p95_ms"] > args.max_p95:
+        reasons.append(f"p95 {level['p95_ms']:.0f} ms > {args.max_p95:.0f} ms")
+    if level["error_rate"] > args.max_errors:
+        reasons.append(f"errores {level['error_rate']:.1%} > {args.max_errors:.1%}")
+    return reasons
+
+
+def start_backend(port: int) -> subprocess.Popen:
+    """``reflex run --backend-only`` contra la base local de DATABASE_URL."""
+    env = dict(os.environ, METRICS_ENABLED="1")
+    print(f"📦 Levantando el backend en el puerto {port}...")
+    return subprocess.Popen(
+        [sys.executable, "-m", "reflex", "run", "--backend-only", "--backend-port", str(port), "--loglevel", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def wait_backend(url: str, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{url}/ping", timeout=2)
+            return
+        except (urllib.error.URLError, OSError):
+            time.sleep(1)
+    raise SystemExit(f"❌ El backend no respondió en {url}")
+
+
+async def run(args: argparse.Namespace) -> int:
+    from nuevo_intento import pages  # noqa: F401  registra ALL_PAGES
+    from nuevo_intento.templates.template import ALL_PAGES
+
+    from .synthetic import is_local, parse_count
+
+    known = {page["route"] for page in ALL_PAGES}
+    routes = args.routes.split(",") if args.routes else list(DEFAULT_ROUTES)
+    if unknown := [route for route in routes if route not in known]:
+        raise SystemExit(f"Rutas inexistentes en ALL_PAGES: {', '.join(unknown)}")
+    names = _state_names()
+
+    backend = None
+    if args.url is None:
+        database_url = os.getenv("DATABASE_URL", "")
+        if not is_local(database_url) and not args.allow_remote:
+            raise SystemExit("DATABASE_URL no es local; usa --allow-remote para cargar otra base")
+        backend = start_backend(args.port)
+        args.url = f"http://localhost:{args.port}"
+    try:
+        wait_backend(args.url)
+        probe = MetricsProbe(args.url)
+        levels, reasons = [], []
+        print(
+            f"{'sesiones':>8} {'acc/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errores':>8}"
+            f" {'pool':>5} {'libre':>5} {'saturado':>7} {'espera ms':>9} {'esp p95':>9}"
+        )
+        for sessions in (parse_count(value) for value in args.sessions.split(",")):
+            level = await run_level(args, names, routes, sessions, probe)
+            levels.append(level)
+            report_level(level)
+            if reasons := broken(level, args):
+                break
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait()
+
+    report_actions(levels[-1])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump({"routes": routes, "levels": levels}, out, indent=2, ensure_ascii=False)
+    if reasons:
+        last_ok = levels[-2]["sessions"] if len(levels) > 1 else 0
+        print(f"\n❌ Se cae con {levels[-1]['sessions']} sesiones ({'; '.join(reasons)}); último nivel sano: {last_ok}")
+        return 1
+    print(f"\n✅ Aguanta {levels[-1]['sessions']} sesiones; sube --sessions para encontrar el límite")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones concurrentes del dashboard.")
+    parser.add_argument("--sessions", default="10,25,50,100,200", help="niveles de sesiones concurrentes, separados por coma")
+    parser.add_argument("--duration", type=float, default=30, help="segundos de cada nivel")
+    parser.add_argument("--ramp", type=float, default=5, help="segundos en los que entran las sesiones de un nivel")
+    parser.add_argument("--think", type=float, nargs=2, default=(1.0, 5.0), metavar=("MIN", "MAX"), help="pausa entre acciones (s)")
+    parser.add_argument("--timeout", type=float, default=30, help="máximo (s) que espera una acción antes de contarla como error")
+    parser.add_argument("--routes", help=f"rutas a recorrer (por defecto {','.join(DEFAULT_ROUTES)})")
+    parser.add_argument("--url", help="backend ya levantado (por ejemplo http://localhost:8000); sin esto se levanta uno")
+    parser.add_argument("--port", type=int, default=8011, help="puerto del backend que se levanta")
+    parser.add_argument("--allow-remote", action="store_true", help="permite un DATABASE_URL no local")
+    parser.add_argument("--sample", type=float, default=0.5, help="intervalo (s) de lectura de /metrics")
+    parser.add_argument("--max-p95", type=float, default=2000, help="p95 (ms) desde el que un nivel se considera caído")
+    parser.add_argument("--max-errors", type=float, default=0.01, help="tasa de errores desde la que un nivel se considera caído")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="guarda los resultados de cada nivel en JSON")
+    raise SystemExit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,382 @@
+"""Generador de datos sintéticos con la forma de la capa gold.
+
+Crea ``gold.fact_sales`` y sus dimensiones (clientes, vendedores,
+productos, estados y calendario) con las columnas que consultan
+views/charts.py y backend/table_state.py, a la escala que se pida::
+
+    python -m benchmarks.synthetic --facts 1m --replace
+    python -m benchmarks.synthetic --facts 10m --replace --rollups
+
+Las distribuciones imitan al dataset de Olist: ciudades, vendedores,
+productos y categorías con cola larga (Zipf), ~1.15 items por orden,
+crecimiento a lo largo del tiempo, ciclo semanal y picos de noviembre
+(Black Friday) y diciembre. Los hechos se generan por bloques con NumPy y
+se cargan con ``COPY ... (FORMAT binary)`` armado directamente desde
+arrays, sin pasar fila por fila por Python.
+
+Por defecto sólo escribe en una base local (o en un Postgres embebido,
+por ejemplo la URI de ``pgserver``); apuntar a otro host requiere
+``--allow-remote``.
+"""
+
+import argparse
+import asyncio
+import calendar
+import datetime
+import io
+import os
+import struct
+import time
+from urllib.parse import urlparse
+
+import asyncpg
+import numpy as np
+
+_LOCAL_HOSTS = {"", "localhost", "127.0.0.1", "::1"}
+
+_START = datetime.date(2016, 9, 1)
+_END = datetime.date(2018, 10, 17)
+
+# Ciudades (ciudad, estado) en orden de peso; el peso sigue una Zipf.
+CITIES = [
+    ("sao paulo", "SP"), ("rio de janeiro", "RJ"), ("belo horizonte", "MG"),
+    ("brasilia", "DF"), ("curitiba", "PR"), ("campinas", "SP"),
+    ("porto alegre", "RS"), ("salvador", "BA"), ("guarulhos", "SP"),
+    ("sao bernardo do campo", "SP"), ("niteroi", "RJ"), ("santo andre", "SP"),
+    ("osasco", "SP"), ("santos", "SP"), ("goiania", "GO"),
+    ("sao jose dos campos", "SP"), ("fortaleza", "CE"), ("sorocaba", "SP"),
+    ("recife", "PE"), ("florianopolis", "SC"), ("jundiai", "SP"),
+    ("ribeirao preto", "SP"), ("belem", "PA"), ("nova iguacu", "RJ"),
+    ("barueri", "SP"), ("contagem", "MG"), ("juiz de fora", "MG"),
+    ("campo grande", "MS"), ("manaus", "AM"), ("vitoria", "ES"),
+    ("ibitinga", "SP"), ("maringa", "PR"), ("londrina", "PR"),
+    ("joinville", "SC"), ("natal", "RN"), ("cuiaba", "MT"),
+]
+
+CATEGORIES = [
+    "cama_mesa_banho", "beleza_saude", "esporte_lazer", "moveis_decoracao",
+    "informatica_acessorios", "utilidades_domesticas", "relogios_presentes",
+    "telefonia", "ferramentas_jardim", "automotivo", "brinquedos",
+    "cool_stuff", "perfumaria", "bebes", "eletronicos", "papelaria",
+    "fashion_bolsas_e_acessorios", "pet_shop", "moveis_escritorio",
+    "consoles_games", "malas_acessorios", "construcao_ferramentas_construcao",
+    "eletrodomesticos", "instrumentos_musicais", "livros_interesse_geral",
+]
+
+# (estado, grupo, proporción)
+STATUSES = [
+    ("delivered", "Completed", 0.970),
+    ("shipped", "Pending", 0.011),
+    ("canceled", "Canceled", 0.006),
+    ("unavailable", "Canceled", 0.006),
+    ("invoiced", "Pending", 0.003),
+    ("processing", "Pending", 0.003),
+    ("created", "Pending", 0.0005),
+    ("approved", "Pending", 0.0005),
+]
+
+_DDL = """
+    CREATE SCHEMA IF NOT EXISTS gold;
+    CREATE TABLE gold.dim_calendar (
+        date_key integer PRIMARY KEY,
+        date_ymd date NOT NULL,
+        date_year integer NOT NULL,
+        date_month integer NOT NULL,
+        date_day integer NOT NULL,
+        month_name text NOT NULL
+    );
+    CREATE TABLE gold.dim_status (
+        status_key integer PRIMARY KEY,
+        status text NOT NULL,
+        status_group text NOT NULL
+    );
+    CREATE TABLE gold.dim_customers (
+        customer_key integer PRIMARY KEY,
+        customer_id text NOT NULL,
+        customer_city text,
+        customer_state text
+    );
+    CREATE TABLE gold.dim_sellers (
+        seller_key integer PRIMARY KEY,
+        seller_id text NOT NULL,
+        seller_city text,
+        seller_state text
+    );
+    CREATE TABLE gold.dim_products (
+        product_key integer PRIMARY KEY,
+        product_id text NOT NULL,
+        product_category_name text,
+        product_weight_g integer
+    );
+    CREATE TABLE gold.fact_sales (
+        order_id text NOT NULL,
+        order_item_id integer NOT NULL,
+        price double precision,
+        freight_value double precision,
+        total double precision,
+        customer_key integer,
+        seller_key integer,
+        product_key integer,
+        status_key integer,
+        date_purchase_key integer
+    );
+"""
+
+GOLD_TABLES = (
+    "gold.fact_sales",
+    "gold.dim_customers",
+    "gold.dim_sellers",
+    "gold.dim_products",
+    "gold.dim_status",
+    "gold.dim_calendar",
+)
+
+# Fila binaria de fact_sales para COPY: cantidad de campos y, por campo,
+# largo (int32) + valor, todo big-endian.
+_FACT_ROW = np.dtype([
+    ("fields", ">i2"),
+    ("order_id_len", ">i4"), ("order_id", "S32"),
+    ("order_item_id_len", ">i4"), ("order_item_id", ">i4"),
+    ("price_len", ">i4"), ("price", ">f8"),
+    ("freight_value_len", ">i4"), ("freight_value", ">f8"),
+    ("total_len", ">i4"), ("total", ">f8"),
+    ("customer_key_len", ">i4"), ("customer_key", ">i4"),
+    ("seller_key_len", ">i4"), ("seller_key", ">i4"),
+    ("product_key_len", ">i4"), ("product_key", ">i4"),
+    ("status_key_len", ">i4"), ("status_key", ">i4"),
+    ("date_purchase_key_len", ">i4"), ("date_purchase_key", ">i4"),
+])
+
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_COPY_TRAILER = struct.pack(">h", -1)
+_HEX = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def parse_count(value: str) -> int:
+    """``100k``, ``1m``, ``10M`` o un entero."""
+    value = value.strip().lower().replace("_", "")
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * factor)
+    return int(value)
+
+
+def zipf_weights(n: int, s: float = 1.1) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    return weights / weights.sum()
+
+
+def _mix64(values: np.ndarray, salt: int) -> np.ndarray:
+    """splitmix64: enteros consecutivos -> bits con aspecto aleatorio."""
+    with np.errstate(over="ignore"):
+        z = values.astype(np.uint64) + np.uint64((0x9E3779B97F4A7C15 * (salt + 1)) % 2 ** 64)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def hex_ids(values: np.ndarray, salt: int) -> np.ndarray:
+    """Ids de 32 caracteres hexadecimales (como los de Olist), array ``S32``."""
+    halves = [_mix64(values, salt), _mix64(values, salt + 7)]
+    shifts = np.arange(60, -1, -4, dtype=np.uint64)
+    digits = np.concatenate(
+        [((half[:, None] >> shifts) & np.uint64(0xF)).astype(np.uint8) for half in halves], axis=1
+    )
+    return np.ascontiguousarray(_HEX[digits]).view("S32").ravel()
+
+
+def calendar_days(start: datetime.date = datetime.date(2016, 1, 1), end: datetime.date = datetime.date(2018, 12, 31)) -> list[datetime.date]:
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def day_weights(days: list[datetime.date]) -> np.ndarray:
+    """Peso de cada día de compra: tendencia, semana y temporada."""
+    weights = np.zeros(len(days))
+    span = (_END - _START).days
+    for i, day in enumerate(days):
+        if not _START <= day <= _END:
+            continue
+        trend = 0.2 + 1.6 * (day - _START).days / span
+        weekly = (1.15, 1.12, 1.08, 1.05, 0.98, 0.80, 0.82)[day.weekday()]
+        season = {11: 1.25, 12: 1.15, 1: 0.95, 2: 0.9}.get(day.month, 1.0)
+        if day.month == 11 and 23 <= day.day <= 27:
+            season *= 3.0  # Black Friday
+        weights[i] = trend * weekly * season
+    return weights / weights.sum()
+
+
+class Generator:
+    """Genera las tablas para ``facts`` filas de hechos."""
+
+    def __init__(self, facts: int, seed: int = 42):
+        self.facts = facts
+        self.rng = np.random.default_rng(seed)
+        self.customers = max(1_000, facts // 10)
+        self.sellers = max(100, facts // 300)
+        self.products = max(500, facts // 4)
+        self.days = calendar_days()
+        self.day_keys = np.asarray([int(d.strftime("%Y%m%d")) for d in self.days], dtype=np.int32)
+        self.day_p = day_weights(self.days)
+        self.seller_p = zipf_weights(self.sellers, 1.05)
+        self.product_p = zipf_weights(self.products, 0.9)
+        self.status_p = np.asarray([p for _, _, p in STATUSES])
+        self.status_p /= self.status_p.sum()
+        self._orders = 0
+
+    def _places(self, n: int) -> np.ndarray:
+        return self.rng.choice(len(CITIES), size=n, p=zipf_weights(len(CITIES), 1.2))
+
+    def calendar_records(self) -> list[tuple]:
+        return [
+            (int(d.strftime("%Y%m%d")), d, d.year, d.month, d.day, calendar.month_name[d.month])
+            for d in self.days
+        ]
+
+    def status_records(self) -> list[tuple]:
+        return [(i + 1, status, group) for i, (status, group, _) in enumerate(STATUSES)]
+
+    def _place_records(self, n: int, salt: int) -> list[tuple]:
+        ids = hex_ids(np.arange(n), salt).astype(str)
+        places = self._places(n)
+        return [
+            (i + 1, ids[i], CITIES[p][0], CITIES[p][1]) for i, p in enumerate(places.tolist())
+        ]
+
+    def customer_records(self) -> list[tuple]:
+        return self._place_records(self.customers, salt=1)
+
+    def seller_records(self) -> list[tuple]:
+        return self._place_records(self.sellers, salt=2)
+
+    def product_records(self) -> list[tuple]:
+        ids = hex_ids(np.arange(self.products), 3).astype(str)
+        # Las categorías también tienen cola larga; el peso del producto, lognormal.
+        categories = self.rng.choice(
+            len(CATEGORIES), size=self.products, p=zipf_weights(len(CATEGORIES), 0.8)
+        )
+        weights = np.clip(self.rng.lognormal(6.5, 1.0, self.products), 50, 40_000).astype(int)
+        return [
+            (i + 1, ids[i], CATEGORIES[c], int(w))
+            for i, (c, w) in enumerate(zip(categories.tolist(), weights.tolist()))
+        ]
+
+    def fact_chunk(self, n: int) -> np.ndarray:
+        """``n`` hechos como filas binarias de COPY.
+
+        Los items de una orden comparten cliente, fecha y estado; cada orden
+        tiene Geom(0.87) items, que en NumPy empieza en 1 (media 1/0.87 ~1.15).
+        """
+        rng = self.rng
+        sizes = rng.geometric(0.87, size=n)
+        ends = np.cumsum(sizes)
+        orders = int(np.searchsorted(ends, n)) + 1
+        sizes = sizes[:orders]
+        sizes[-1] -= int(ends[orders - 1]) - n
+
+        order_numbers = np.arange(self._orders, self._orders + orders)
+        self._orders += orders
+        starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+        per_order = lambda values: np.repeat(values, sizes)
+
+        rows = np.zeros(n, dtype=_FACT_ROW)
+        rows["fields"] = 10
+        for name in _FACT_ROW.names:
+            if name.endswith("_len"):
+                rows[name] = _FACT_ROW[name[:-4]].itemsize
+
+        price = np.round(np.clip(rng.lognormal(4.5, 0.9, n), 0.85, 6_800), 2)
+        freight = np.round(np.clip(rng.lognormal(2.8, 0.6, n), 0.0, 410), 2)
+        rows["order_id"] = per_order(hex_ids(order_numbers, 0))
+        rows["order_item_id"] = np.arange(n) - starts + 1
+        rows["price"] = price
+        rows["freight_value"] = freight
+        rows["total"] = np.round(price + freight, 2)
+        rows["customer_key"] = per_order(rng.integers(1, self.customers + 1, orders))
+        rows["seller_key"] = rng.choice(self.sellers, size=n, p=self.seller_p) + 1
+        rows["product_key"] = rng.choice(self.products, size=n, p=self.product_p) + 1
+        rows["status_key"] = per_order(rng.choice(len(STATUSES), size=orders, p=self.status_p) + 1)
+        rows["date_purchase_key"] = per_order(self.day_keys[rng.choice(len(self.days), size=orders, p=self.day_p)])
+        return rows
+
+
+def is_local(database_url: str) -> bool:
+    host = urlparse(database_url).hostname or ""
+    return host in _LOCAL_HOSTS or host.startswith("/") or "host=/" in database_url
+
+
+async def generate(database_url: str, facts: int, replace: bool = False, chunk: int = 1_000_000, seed: int = 42):
+    """Crea y carga las tablas gold con ``facts`` hechos."""
+    gen = Generator(facts, seed)
+    conn = await asyncpg.connect(database_url)
+    try:
+        existing = [t for t in GOLD_TABLES if await conn.fetchval("SELECT to_regclass($1)", t)]
+        if existing and not replace:
+            raise SystemExit(f"Ya existen {', '.join(existing)}; usa --replace para recrearlas")
+        for table in existing:
+            await conn.execute(f"DROP TABLE {table} CASCADE")
+        await conn.execute(_DDL)
+
+        started = time.perf_counter()
+        for table, records in (
+            ("dim_calendar", gen.calendar_records()),
+            ("dim_status", gen.status_records()),
+            ("dim_customers", gen.customer_records()),
+            ("dim_sellers", gen.seller_records()),
+            ("dim_products", gen.product_records()),
+        ):
+            await conn.copy_records_to_table(table, schema_name="gold", records=records)
+            print(f"📦 gold.{table}: {len(records):,} filas")
+
+        loaded = 0
+        while loaded < facts:
+            rows = gen.fact_chunk(min(chunk, facts - loaded))
+            payload = io.BytesIO(_COPY_HEADER + rows.tobytes() + _COPY_TRAILER)
+            await conn.copy_to_table("fact_sales", schema_name="gold", source=payload, format="binary")
+            loaded += len(rows)
+            print(f"📦 gold.fact_sales: {loaded:,} / {facts:,}")
+
+        await conn.execute(
+            "ALTER TABLE gold.fact_sales ADD PRIMARY KEY (order_id, order_item_id)"
+        )
+        # El índice que el ETL real agrega como migración (rollups.FACT_INDEX).
+        await conn.execute(
+            "CREATE INDEX fact_sales_date_purchase_key_idx ON gold.fact_sales (date_purchase_key)"
+        )
+        for table in GOLD_TABLES:
+            await conn.execute(f"ANALYZE {table}")
+        print(f"✅ {facts:,} hechos generados en {time.perf_counter() - started:.1f}s")
+    finally:
+        await conn.close()
+
+
+async def _main(args: argparse.Namespace):
+    database_url = args.database_url or os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("Falta --database-url o DATABASE_URL")
+    if not is_local(database_url) and not args.allow_remote:
+        raise SystemExit("La base no es local; usa --allow-remote para escribir en ella")
+    await generate(database_url, parse_count(args.facts), args.replace, parse_count(args.chunk), args.seed)
+    if args.rollups:
+        os.environ["DATABASE_URL"] = database_url
+        from nuevo_intento.backend.db import close_pools, get_pool
+        from nuevo_intento.backend.rollups import migrate_rollups, refresh_rollups
+
+        try:
+            pool = await get_pool()
+            await migrate_rollups(pool)
+            await refresh_rollups(pool)
+            print("✅ Tablas resumen actualizadas")
+        finally:
+            await close_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos de la capa gold.")
+    parser.add_argument("--facts", default="100k", help="filas de hechos: 100k, 1m, 10m...")
+    parser.add_argument("--database-url", help="por defecto DATABASE_URL")
+    parser.add_argument("--replace", action="store_true", help="borra y recrea las tablas gold")
+    parser.add_argument("--rollups", action="store_true", help="construye las tablas derivadas al final")
+    parser.add_argument("--chunk", default="1m", help="hechos por bloque de COPY")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--allow-remote", action="store_true", help="permite una base no local")
+    asyncio.run(_main(parser.parse_args()))
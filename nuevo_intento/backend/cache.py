@@ -0,0 +1,230 @@
+"""Caché de resultados de consultas para los gráficos del dashboard.
+
+La capa gold sólo cambia cuando corre el ETL, así que los resultados de
+las consultas agregadas se guardan con TTL. La clave es el tipo de lectura
+más el SQL normalizado y los argumentos enlazados, bajo un namespace. Los
+valores se guardan como JSON (y comprimidos con zlib si son grandes), sólo
+datos: nada de lo que se lea de un backend compartido se ejecuta. Se
+guardan en un backend de cache_backends.py: en memoria del proceso, o en
+Redis con ``QUERY_CACHE_BACKEND=redis`` para que todos los workers
+compartan los resultados. Los fallos concurrentes de una misma clave se
+resuelven con una sola consulta (``single_flight``).
+"""
+
+import contextlib
+import datetime
+import decimal
+import json
+import os
+import re
+import zlib
+from typing import Any, Awaitable, Callable, Hashable
+
+from asyncpg import Connection, Pool
+
+from .cache_backends import MemoryBackend, RedisBackend
+from .db import acquire
+from .singleflight import SingleFlight
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Primer byte de cada valor guardado: cómo decodificar el resto. Las
+# entradas con otro byte (por ejemplo de versiones que usaban pickle) se
+# tratan como fallo de caché.
+_JSON = b"\x02"
+_JSON_ZLIB = b"\x03"
+
+
+def _encode(value: Any) -> dict:
+    """Tipos de asyncpg que JSON no tiene, como ``{"__type__": ..., "value": ...}``."""
+    if isinstance(value, datetime.datetime):
+        return {"__type__": "datetime", "value": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"__type__": "date", "value": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"__type__": "decimal", "value": str(value)}
+    raise TypeError(f"{type(value).__name__} no se puede guardar en la caché")
+
+
+_DECODERS = {
+    "datetime": datetime.datetime.fromisoformat,
+    "date": datetime.date.fromisoformat,
+    "decimal": decimal.Decimal,
+}
+
+
+def _decode(obj: dict) -> Any:
+    kind = obj.get("__type__")
+    if kind in _DECODERS and len(obj) == 2:
+        return _DECODERS[kind](obj["value"])
+    return obj
+
+
+def normalize_sql(query: str) -> str:
+    """Colapsa espacios y quita el ``;`` final para que el texto sea estable."""
+    return _WHITESPACE.sub(" ", query).strip().rstrip(";").strip()
+
+
+def make_key(query: str, args: tuple, kind: str = "fetch") -> tuple[str, str, tuple]:
+    return kind, normalize_sql(query), tuple(args)
+
+
+class QueryCache:
+    """Caché con TTL y contadores de aciertos/fallos sobre un backend de bytes.
+
+    Un error del backend (por ejemplo Redis caído) se trata como fallo de
+    caché: la consulta va a la base y el dashboard sigue funcionando.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        ttl: float = 300.0,
+        namespace: str = "dashboard",
+        compress_min_size: int = 1024,
+    ):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.namespace = namespace
+        self.compress_min_size = compress_min_size
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _prefix(self) -> str:
+        return f"{self.namespace}:"
+
+    def storage_key(self, key: Hashable) -> str:
+        """Clave de texto en el backend: ``namespace:tipo:sql:args``."""
+        kind, sql, args = key
+        return f"{self._prefix()}{kind}:{sql}:{args!r}"
+
+    def dumps(self, value: Any) -> bytes:
+        data = json.dumps(value, default=_encode, separators=(",", ":")).encode()
+        if self.compress_min_size and len(data) >= self.compress_min_size:
+            return _JSON_ZLIB + zlib.compress(data)
+        return _JSON + data
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        """Decodifica un valor guardado; lanza ValueError si no es de este formato."""
+        tag, body = data[:1], data[1:]
+        if tag == _JSON_ZLIB:
+            body = zlib.decompress(body)
+        elif tag != _JSON:
+            raise ValueError(f"formato de caché desconocido: {tag!r}")
+        return json.loads(body, object_hook=_decode)
+
+    async def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Devuelve ``(encontrado, valor)``; las entradas vencidas cuentan como fallo."""
+        try:
+            data = await self.backend.get(self.storage_key(key))
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Caché no disponible: {e}")
+            data = None
+        if data is not None:
+            try:
+                value = self.loads(data)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Entrada de caché ilegible, se ignora: {e}")
+            else:
+                self.hits += 1
+                return True, value
+        self.misses += 1
+        return False, None
+
+    async def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        try:
+            await self.backend.set(
+                self.storage_key(key), self.dumps(value), self.ttl if ttl is None else ttl
+            )
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ No se pudo guardar en la caché: {e}")
+
+    async def invalidate(self, pattern: str | None = None) -> int:
+        """Borra todo el namespace, o sólo las consultas cuyo SQL contiene ``pattern``.
+
+        Devuelve la cantidad de entradas eliminadas.
+        """
+        return await self.backend.delete(self._prefix(), pattern)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            **self.backend.stats(),
+            "namespace": self.namespace,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def _make_backend():
+    if os.getenv("QUERY_CACHE_BACKEND", "memory").lower() == "redis":
+        import redis.asyncio as redis
+
+        url = os.getenv("QUERY_CACHE_REDIS_URL") or os.getenv("REDIS_URL", "redis://localhost:6379")
+        return RedisBackend(redis.from_url(url))
+    return MemoryBackend(maxsize=int(os.getenv("QUERY_CACHE_SIZE", "256")))
+
+
+query_cache = QueryCache(
+    backend=_make_backend(),
+    ttl=float(os.getenv("QUERY_CACHE_TTL", "300")),
+    namespace=os.getenv("QUERY_CACHE_NAMESPACE", "dashboard"),
+    compress_min_size=int(os.getenv("QUERY_CACHE_COMPRESS_MIN", "1024")),
+)
+
+single_flight = SingleFlight()
+
+
+@contextlib.asynccontextmanager
+async def _connection(source: Pool | Connection):
+    """Conexión del pool, o la misma conexión si ya se tiene una."""
+    if isinstance(source, Pool):
+        async with acquire(source) as conn:
+            yield conn
+    else:
+        yield source
+
+
+async def _cached(source: Pool | Connection, key: tuple, load: Callable[[], Awaitable[Any]]) -> Any:
+    found, value = await query_cache.get(key)
+    if found:
+        return value
+
+    async def load_and_store() -> Any:
+        value = await load()
+        await query_cache.set(key, value)
+        return value
+
+    # Con una conexión prestada no se comparte la ejecución: si quien la
+    # tiene se cancela, la conexión vuelve al pool con la consulta en curso.
+    if not isinstance(source, Pool):
+        return await load_and_store()
+    return await single_flight.do(key, load_and_store)
+
+
+async def cached_fetch(source: Pool | Connection, query: str, *args) -> list[dict]:
+    """``conn.fetch`` con caché; las filas se devuelven como dicts."""
+
+    async def load() -> list[dict]:
+        async with _connection(source) as conn:
+            return [dict(r) for r in await conn.fetch(query, *args)]
+
+    return await _cached(source, make_key(query, args), load)
+
+
+async def cached_fetchval(source: Pool | Connection, query: str, *args) -> Any:
+    """``conn.fetchval`` con caché."""
+
+    async def load() -> Any:
+        async with _connection(source) as conn:
+            return await conn.fetchval(query, *args)
+
+    return await _cached(source, make_key(query, args, "fetchval"), load)
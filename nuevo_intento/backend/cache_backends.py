@@ -0,0 +1,97 @@
+"""Almacenes de bytes para la caché de consultas.
+
+``QueryCache`` (en cache.py) serializa los resultados y delega el guardado
+en un backend: ``MemoryBackend`` vive en el proceso y ``RedisBackend`` se
+comparte entre todos los workers. Ambos tienen la misma interfaz async:
+
+- ``get(key) -> bytes | None``
+- ``set(key, data, ttl)``
+- ``delete(prefix, contains=None) -> int``: borra las claves que empiezan
+  con ``prefix`` y contienen ``contains``.
+- ``stats() -> dict``
+"""
+
+import time
+from collections import OrderedDict
+
+
+class MemoryBackend:
+    """LRU con TTL dentro del proceso."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return data
+
+    async def set(self, key: str, data: bytes, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, data)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, prefix: str, contains: str | None = None) -> int:
+        keys = [
+            key
+            for key in self._data
+            if key.startswith(prefix) and (contains is None or contains in key[len(prefix):])
+        ]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": sum(len(data) for _, data in self._data.values()),
+        }
+
+
+def _escape_glob(value: str) -> str:
+    """Escapa los comodines del MATCH de Redis."""
+    for char in "\\*?[]":
+        value = value.replace(char, "\\" + char)
+    return value
+
+
+class RedisBackend:
+    """Entradas compartidas en Redis; el TTL lo aplica el servidor.
+
+    ``client`` es un ``redis.asyncio.Redis`` (o cualquier objeto con
+    ``get``, ``set(px=)``, ``scan_iter(match=)`` y ``delete``), así que en
+    pruebas se puede usar un doble en memoria.
+    """
+
+    def __init__(self, client, scan_count: int = 500):
+        self.client = client
+        self.scan_count = scan_count
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, data: bytes, ttl: float):
+        await self.client.set(key, data, px=max(1, int(ttl * 1000)))
+
+    async def delete(self, prefix: str, contains: str | None = None) -> int:
+        match = _escape_glob(prefix) + "*"
+        if contains is not None:
+            match += _escape_glob(contains) + "*"
+        keys = [key async for key in self.client.scan_iter(match=match, count=self.scan_count)]
+        removed = 0
+        for start in range(0, len(keys), self.scan_count):
+            removed += await self.client.delete(*keys[start:start + self.scan_count])
+        return removed
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
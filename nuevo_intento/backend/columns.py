@@ -0,0 +1,112 @@
+"""Almacenamiento columnar compacto para filas de un modelo pydantic.
+
+Los campos de texto se guardan codificados como diccionario (códigos
+int32 + lista de valores distintos, que se repiten mucho: ciudades,
+estados, categorías) y los numéricos en arrays de NumPy. Sólo se
+materializan como modelos las filas que se piden, típicamente la página
+visible de la tabla.
+"""
+
+from itertools import islice
+from typing import Iterable, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+_NUMPY_TYPES = {int: np.int64, float: np.float64}
+
+
+def encode(values: Sequence, index: dict | None = None) -> tuple[np.ndarray, list]:
+    """Codifica una columna como (códigos int32, valores únicos).
+
+    ``index`` (valor -> código) permite seguir codificando lotes con el
+    mismo diccionario. ``None`` se conserva como un valor más, igual que un
+    GROUP BY de SQL.
+    """
+    index = {} if index is None else index
+    codes = np.fromiter(
+        (index.setdefault(v, len(index)) for v in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, list(index)
+
+
+class ColumnStore:
+    """Filas de ``model`` guardadas por columna."""
+
+    def __init__(self, model: type[BaseModel]):
+        self.model = model
+        self._types = {name: field.annotation for name, field in model.model_fields.items()}
+        self._columns = {
+            name: np.zeros(0, dtype=_NUMPY_TYPES.get(kind, np.int32))
+            for name, kind in self._types.items()
+        }
+        # Diccionarios de los campos de texto: valor -> código.
+        self._index: dict[str, dict] = {
+            name: {} for name, kind in self._types.items() if kind not in _NUMPY_TYPES
+        }
+        # Los mismos valores en orden de código, para decodificar sin copiarlos.
+        self._values: dict[str, list] = {name: [] for name in self._index}
+
+    def __len__(self) -> int:
+        return len(next(iter(self._columns.values())))
+
+    def append(self, items: Iterable[BaseModel]):
+        """Agrega un lote de filas al final."""
+        batch: dict[str, list] = {name: [] for name in self._types}
+        for item in items:
+            for name, values in batch.items():
+                values.append(getattr(item, name))
+
+        for name, values in batch.items():
+            if name in self._index:
+                index, known = self._index[name], self._values[name]
+                codes, _ = encode(values, index)
+                known.extend(islice(index, len(known), None))
+            else:
+                codes = np.asarray(values, dtype=_NUMPY_TYPES[self._types[name]])
+            self._columns[name] = np.concatenate((self._columns[name], codes))
+
+    def is_text(self, name: str) -> bool:
+        return name in self._index
+
+    def column(self, name: str) -> np.ndarray:
+        """Valores de un campo numérico, o códigos de un campo de texto."""
+        return self._columns[name]
+
+    def values(self, name: str) -> list:
+        """Diccionario de un campo de texto (posición = código); no modificar."""
+        return self._values[name]
+
+    def sort_keys(self, name: str) -> np.ndarray:
+        """Claves numéricas que ordenan el campo como ``str.lower()``."""
+        if not self.is_text(name):
+            return self._columns[name]
+        lowered = [value.lower() for value in self._index[name]]
+        _, ranks = np.unique(np.asarray(lowered), return_inverse=True)
+        return ranks[self._columns[name]]
+
+    def search(self, query: str, fields: Sequence[str]) -> np.ndarray:
+        """Filas con ``query`` en alguno de ``fields``, revisando cada valor
+        distinto una sola vez."""
+        query = query.lower()
+        selected = np.zeros(len(self), dtype=bool)
+        for name in fields:
+            matches = [code for value, code in self._index[name].items() if query in value.lower()]
+            if matches:
+                selected |= np.isin(self._columns[name], matches)
+        return np.flatnonzero(selected).astype(np.int32)
+
+    def items(self, ids: Iterable[int]) -> list[BaseModel]:
+        """Materializa las filas ``ids`` como modelos."""
+        rows = []
+        for i in ids:
+            row = {}
+            for name, column in self._columns.items():
+                if name in self._values:
+                    row[name] = self._values[name][column[i]]
+                else:
+                    row[name] = column[i].item()
+            rows.append(self.model(**row))
+        return rows
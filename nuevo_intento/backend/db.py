@@ -0,0 +1,126 @@
+"""Registro de pools de conexión a Neon compartido por todo el proceso.
+
+Cada worker abre un único pool por DATABASE_URL: se crea al arrancar la
+app (ver ``pool_lifespan``) o, como respaldo, en el primer uso, y se cierra
+al apagarla. Todos los estados lo piden con ``get_pool()`` y toman
+conexiones con ``acquire(pool)``, que mide la espera si las métricas están
+activas (ver metrics.py).
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+
+import asyncpg
+from asyncpg import Pool
+from dotenv import load_dotenv
+
+from . import metrics, querylog
+
+load_dotenv()
+
+_pools: dict[str, Pool] = {}
+_lock = asyncio.Lock()
+
+
+def _pool_settings() -> dict:
+    """Tamaño del pool, timeout y caché de statements, configurables por
+    variables de entorno."""
+    settings = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        "command_timeout": float(os.getenv("DB_COMMAND_TIMEOUT", "60")),
+        # Statements preparados por conexión; alcanza para todos los de
+        # queries.py, así ninguno se vuelve a preparar por desalojo.
+        "statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256")),
+    }
+    if metrics.ENABLED or querylog.ENABLED:
+        settings["connection_class"] = InstrumentedConnection
+    return settings
+
+
+class InstrumentedConnection(asyncpg.Connection):
+    """Conexión que mide cada consulta para las métricas y el log de lentas."""
+
+    async def _measure(self, kind: str, call, query: str, args: tuple, rows):
+        started = time.perf_counter()
+        result = await call
+        elapsed = time.perf_counter() - started
+        count = rows(result)
+        if metrics.ENABLED:
+            metrics.query_duration.observe(elapsed, kind)
+            metrics.query_rows.observe(count, kind)
+        if querylog.ENABLED:
+            querylog.record(query, args, elapsed * 1000, count)
+        return result
+
+    async def fetch(self, query, *args, **kwargs):
+        return await self._measure(
+            "fetch", super().fetch(query, *args, **kwargs), query, args, len
+        )
+
+    async def fetchrow(self, query, *args, **kwargs):
+        return await self._measure(
+            "fetchrow", super().fetchrow(query, *args, **kwargs), query, args,
+            lambda r: int(r is not None),
+        )
+
+    async def fetchval(self, query, *args, **kwargs):
+        return await self._measure(
+            "fetchval", super().fetchval(query, *args, **kwargs), query, args,
+            lambda r: int(r is not None),
+        )
+
+
+def _database_url() -> str:
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise ValueError("DATABASE_URL no está configurada en el archivo .env")
+    return database_url
+
+
+async def get_pool(database_url: str | None = None) -> Pool:
+    """Devuelve el pool del proceso, creándolo una sola vez."""
+    database_url = database_url or _database_url()
+    pool = _pools.get(database_url)
+    if pool is not None:
+        return pool
+
+    # Dos on_load simultáneos no deben crear dos pools.
+    async with _lock:
+        pool = _pools.get(database_url)
+        if pool is None:
+            pool = await asyncpg.create_pool(database_url, **_pool_settings())
+            _pools[database_url] = pool
+    return pool
+
+
+@contextlib.asynccontextmanager
+async def acquire(pool: Pool):
+    """``pool.acquire()`` que registra cuánto se esperó por la conexión."""
+    started = time.perf_counter()
+    async with pool.acquire() as conn:
+        if metrics.ENABLED:
+            metrics.acquire_wait.observe(time.perf_counter() - started)
+        yield conn
+
+
+async def close_pools():
+    """Cierra todos los pools registrados."""
+    async with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        await pool.close()
+
+
+@contextlib.asynccontextmanager
+async def pool_lifespan():
+    """Tarea de lifespan: abre el pool al arrancar y lo cierra al apagar."""
+    if os.getenv("DATABASE_URL"):
+        await get_pool()
+    try:
+        yield
+    finally:
+        await close_pools()
@@ -0,0 +1,293 @@
+"""Motor analítico en memoria para los gráficos del dashboard.
+
+Carga la tabla de hechos desnormalizada (el mismo join que usa la tabla de
+/table, con una marca por dimensión de si la fila tiene su registro) en
+arrays de NumPy por columna, con las columnas de texto
+codificadas como diccionario (códigos enteros + lista de valores). Los
+agrupamientos, sumas, top-N y filtros por fecha se resuelven con máscaras
+vectorizadas y ``np.bincount``, sin ir a Postgres.
+
+Se activa con ``ANALYTICS_ENGINE=1``: cada worker lo carga al arrancar y
+cada ``ANALYTICS_ENGINE_REFRESH`` segundos incorpora sólo los hechos desde
+su marca de agua (el mayor ``date_purchase_key`` cargado), igual que el
+refresco incremental de los rollups. Mientras no esté cargado,
+``engine.ready`` es falso y los estados consultan a Neon.
+"""
+
+import asyncio
+import contextlib
+import datetime
+import os
+
+import numpy as np
+from asyncpg import Pool
+
+from .columns import encode
+from .db import acquire, get_pool
+from .queries import CUSTOMER_COUNT, ENGINE_FACTS, ENGINE_NEW_FACTS
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+# Columnas de texto que se codifican como diccionario.
+CATEGORICAL_COLUMNS = (
+    "order_id",
+    "customer_city",
+    "customer_state",
+    "product_category_name",
+    "seller_id",
+)
+
+# Dimensiones que requiere cada agrupamiento, como los JOIN (internos) de
+# los rollups y de ``queries.LINE_CHART``: los hechos sin esa dimensión no
+# forman un grupo ``None``, quedan fuera. Las tres pestañas del gráfico de
+# líneas piden cliente y producto.
+REQUIRED_JOINS = {
+    "customer_state": ("has_customer", "has_product"),
+    "customer_city": ("has_customer", "has_product"),
+    "product_category_name": ("has_customer", "has_product"),
+    "seller_id": ("has_seller",),
+}
+
+# Filas por lote al leer el motor con el cursor del servidor.
+ENGINE_BATCH = int(os.getenv("ANALYTICS_ENGINE_BATCH", "10000"))
+
+
+def _to_days(value: datetime.date | None) -> int:
+    return (value - _EPOCH).days if value is not None else -1
+
+
+class SalesEngine:
+    """Columnas de ``gold.fact_sales`` desnormalizadas en memoria."""
+
+    def __init__(self):
+        self.ready = False
+        self.loaded_at: datetime.datetime | None = None
+        self.watermark: int | None = None
+        self.columns: dict[str, np.ndarray] = {}
+        self.categories: dict[str, list] = {}
+        # COUNT(*) de gold.dim_customers, leído en cada carga.
+        self.customers = 0
+
+    def __len__(self) -> int:
+        return len(self.columns.get("total", ()))
+
+    def _build(self, rows: list, indexes: dict[str, dict]) -> tuple[dict, dict]:
+        """Columnas de ``rows``, codificando los textos con ``indexes``."""
+        columns: dict[str, np.ndarray] = {}
+        categories: dict[str, list] = {}
+        for name in CATEGORICAL_COLUMNS:
+            columns[name], categories[name] = encode([r[name] for r in rows], indexes[name])
+
+        columns["total"] = np.fromiter(
+            (float(r["total"] or 0.0) for r in rows), dtype=np.float64, count=len(rows)
+        )
+        columns["days"] = np.fromiter(
+            (_to_days(r["date_ymd"]) for r in rows), dtype=np.int32, count=len(rows)
+        )
+        columns["date_key"] = np.fromiter(
+            (r["date_purchase_key"] if r["date_purchase_key"] is not None else -1 for r in rows),
+            dtype=np.int32,
+            count=len(rows),
+        )
+        for name in ("date_year", "date_month", "date_day"):
+            columns[name] = np.fromiter(
+                (r[name] or 0 for r in rows), dtype=np.int16, count=len(rows)
+            )
+        for name in ("has_customer", "has_product", "has_seller"):
+            columns[name] = np.fromiter((r[name] for r in rows), dtype=bool, count=len(rows))
+        return columns, categories
+
+    def _replace(self, columns: dict, categories: dict, customers: int | None = None):
+        # Se reemplaza todo de una vez para que una consulta concurrente
+        # nunca vea columnas de cargas distintas.
+        self.columns, self.categories = columns, categories
+        if customers is not None:
+            self.customers = customers
+        keys = columns["date_key"]
+        self.watermark = int(keys.max()) if len(keys) and keys.max() >= 0 else None
+        self.loaded_at = datetime.datetime.now()
+        self.ready = True
+
+    def _indexes(self) -> dict[str, dict]:
+        """Diccionarios actuales como valor -> código, para seguir codificando."""
+        return {
+            name: {value: code for code, value in enumerate(self.categories[name])}
+            for name in CATEGORICAL_COLUMNS
+        }
+
+    def _fold(self, new: dict, since: int) -> dict:
+        """Columnas actuales sin los hechos desde ``since`` (ni los sin fecha), más ``new``."""
+        keys = self.columns["date_key"]
+        keep = (keys >= 0) & (keys < since)
+        return {
+            name: np.concatenate((column[keep], new[name]))
+            for name, column in self.columns.items()
+        }
+
+    def load_rows(self, rows: list):
+        """Construye las columnas a partir de filas (Record o dict)."""
+        self._replace(*self._build(rows, {name: {} for name in CATEGORICAL_COLUMNS}))
+
+    def fold_rows(self, rows: list, since: int):
+        """Reemplaza los hechos desde ``since`` (y los sin fecha) por ``rows``.
+
+        Los diccionarios existentes se extienden, así que los códigos de las
+        filas que se conservan no cambian.
+        """
+        new, categories = self._build(rows, self._indexes())
+        self._replace(self._fold(new, since), categories)
+
+    async def _read(self, pool: Pool, indexes: dict[str, dict], *args) -> tuple[dict, dict, int]:
+        """Lee los hechos del motor con un cursor del servidor.
+
+        Sin ``args`` lee todos; con la marca de agua, sólo los nuevos. Cada
+        lote se convierte a arrays en un hilo aparte, así el event loop no
+        se bloquea y en memoria nunca hay más de ENGINE_BATCH Records.
+        Devuelve las columnas, los diccionarios y el total de clientes.
+        """
+        statement = ENGINE_NEW_FACTS if args else ENGINE_FACTS
+        parts, categories = [], {}
+        async with acquire(pool) as conn:
+            # Los cursores del servidor sólo viven dentro de una transacción
+            async with conn.transaction(readonly=True):
+                cursor = await conn.cursor(statement.sql, *statement.bind(args))
+                while rows := await cursor.fetch(ENGINE_BATCH):
+                    columns, categories = await asyncio.to_thread(self._build, rows, indexes)
+                    parts.append(columns)
+            customers = await conn.fetchval(CUSTOMER_COUNT.sql) or 0
+        if not parts:
+            columns, categories = self._build([], indexes)
+            return columns, categories, customers
+
+        def concatenate() -> dict:
+            return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+        return await asyncio.to_thread(concatenate), categories, customers
+
+    async def load(self, pool: Pool):
+        indexes = {name: {} for name in CATEGORICAL_COLUMNS}
+        self._replace(*await self._read(pool, indexes))
+        print(f"✅ Motor analítico cargado con {len(self)} filas")
+
+    async def refresh(self, pool: Pool):
+        """Incorpora los hechos nuevos; la primera vez carga todo."""
+        if not self.ready or self.watermark is None:
+            await self.load(pool)
+            return
+        since = self.watermark
+        new, categories, customers = await self._read(pool, self._indexes(), since)
+        self._replace(await asyncio.to_thread(self._fold, new, since), categories, customers)
+        print(f"✅ Motor analítico actualizado: {len(new['total'])} filas desde {since}")
+
+    def mask(
+        self,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        day: int | None = None,
+    ) -> np.ndarray:
+        """Máscara booleana de filas para un rango de fechas y/o año, mes, día.
+
+        Las filas sin fecha de calendario quedan fuera, como en el JOIN a
+        ``dim_calendar`` de las consultas SQL.
+        """
+        cols = self.columns
+        selected = cols["days"] >= 0
+        if start is not None:
+            selected &= cols["days"] >= _to_days(start)
+        if end is not None:
+            selected &= cols["days"] <= _to_days(end)
+        for name, value in (("date_year", year), ("date_month", month), ("date_day", day)):
+            if value is not None:
+                selected &= cols[name] == value
+        return selected
+
+    def _group_sum(self, keys: np.ndarray, selected: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Suma ``total`` por clave entera; devuelve (claves presentes, sumas)."""
+        keys = keys[selected]
+        if not len(keys):
+            return keys, np.zeros(0)
+        base = int(keys.min())
+        shifted = keys - base
+        sums = np.bincount(shifted, weights=self.columns["total"][selected])
+        present = np.bincount(shifted) > 0
+        return np.flatnonzero(present) + base, sums[present]
+
+    def top_n(self, column: str, n: int = 10, **filters) -> list[dict]:
+        """Top ``n`` valores de ``column`` por SUM(total), de mayor a menor."""
+        selected = self.mask(**filters)
+        for join in REQUIRED_JOINS.get(column, ()):
+            selected &= self.columns[join]
+        keys, sums = self._group_sum(self.columns[column], selected)
+        if len(sums) > n:
+            top = np.argpartition(-sums, n - 1)[:n]
+            keys, sums = keys[top], sums[top]
+        order = np.argsort(-sums, kind="stable")
+        labels = self.categories[column]
+        return [{"label": labels[k], "ventas": float(v)} for k, v in zip(keys[order], sums[order])]
+
+    def sales_by_day(self, **filters) -> list[dict]:
+        keys, sums = self._group_sum(self.columns["days"], self.mask(**filters))
+        return [
+            {"date": _EPOCH + datetime.timedelta(days=int(k)), "ventas": float(v)}
+            for k, v in zip(keys, sums)
+        ]
+
+    def sales_by_year(self, **filters) -> list[dict]:
+        keys, sums = self._group_sum(self.columns["date_year"], self.mask(**filters))
+        return [{"date_year": int(k), "ventas": float(v)} for k, v in zip(keys, sums)]
+
+    def sales_by_month(self, **filters) -> list[dict]:
+        cols = self.columns
+        keys = cols["date_year"].astype(np.int32) * 100 + cols["date_month"]
+        keys, sums = self._group_sum(keys, self.mask(**filters))
+        return [
+            {"date_year": int(k) // 100, "date_month": int(k) % 100, "ventas": float(v)}
+            for k, v in zip(keys, sums)
+        ]
+
+    def total_sales(self) -> float:
+        return float(self.columns["total"].sum())
+
+    def distinct_orders(self) -> int:
+        """COUNT(DISTINCT order_id): los códigos presentes menos NULL.
+
+        Se cuentan los códigos y no el diccionario porque tras un refresco
+        incremental puede tener valores de filas que ya no están.
+        """
+        order_ids = self.categories["order_id"]
+        present = np.bincount(self.columns["order_id"], minlength=len(order_ids)) > 0
+        if None in order_ids:
+            present[order_ids.index(None)] = False
+        return int(np.count_nonzero(present))
+
+
+engine = SalesEngine()
+
+
+def engine_enabled() -> bool:
+    return os.getenv("ANALYTICS_ENGINE", "0").lower() in ("1", "true", "yes")
+
+
+@contextlib.asynccontextmanager
+async def engine_lifespan():
+    """Tarea de lifespan: carga el motor y lo recarga periódicamente."""
+
+    async def refresh_loop():
+        interval = float(os.getenv("ANALYTICS_ENGINE_REFRESH", "3600"))
+        while True:
+            try:
+                await engine.refresh(await get_pool())
+            except Exception as e:
+                print(f"❌ Error cargando el motor analítico: {e}")
+            await asyncio.sleep(interval)
+
+    task = asyncio.create_task(refresh_loop()) if engine_enabled() else None
+    try:
+        yield
+    finally:
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
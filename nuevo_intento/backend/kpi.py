@@ -0,0 +1,23 @@
+"""KPIs de la página principal en una sola consulta.
+
+Clientes, ventas y órdenes distintas salen de un único statement
+(``queries.KPIS``), así que las tarjetas cuestan un round trip a Neon.
+Ventas y órdenes se suman de ``gold.rollup_kpi_day`` (totales por día que
+backend/rollups.py mantiene incrementalmente), así que el costo no crece
+con la tabla de hechos y el conteo de órdenes es exacto. Mientras esa
+tabla no esté lista se calcula desde los hechos.
+"""
+
+from asyncpg import Pool
+
+from . import queries
+
+
+async def fetch_kpis(pool: Pool) -> dict:
+    """Clientes, ventas y órdenes en un round trip."""
+    row = await queries.kpis(pool)
+    return {
+        "customers": row["customers"] or 0,
+        "sales": float(row["sales"] or 0.0),
+        "orders": row["orders"] or 0,
+    }
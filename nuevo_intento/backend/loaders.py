@@ -0,0 +1,129 @@
+"""Ejecución concurrente de los loaders de una página.
+
+Por defecto cada handler de ``on_load`` es un evento aparte: se procesan
+uno detrás de otro y cada uno envía su propio delta. Los estados que
+heredan ``ConcurrentLoadMixin`` pueden correrlos juntos con
+``asyncio.gather`` dentro de un solo evento (``run_loaders``), y
+``gather_loaders`` arma esos eventos a partir de la lista de ``on_load``
+de una página (ver ``template(concurrent_on_load=True)``).
+
+Los cambios de filtros usan ``reload_loaders``, que espera a que el
+usuario deje de tocar los controles, junta los pedidos repetidos y cancela
+las recargas que quedaron viejas. Para eso cada loader ``load_x`` tiene su
+consulta en ``_load_x``, que devuelve los campos a actualizar sin tocar el
+estado.
+"""
+
+import asyncio
+import inspect
+import os
+from typing import Callable
+
+import reflex as rx
+from reflex.event import EventHandler
+
+# Espera (s) desde el último cambio de filtro antes de recargar.
+RELOAD_DEBOUNCE = float(os.getenv("CHART_RELOAD_DEBOUNCE", "0.3"))
+
+# Loaders pendientes y recarga en curso por (sesión, estado).
+_pending_loaders: dict[tuple[str, str], set[str]] = {}
+_reload_tasks: dict[tuple[str, str], asyncio.Task] = {}
+
+
+async def _call(fn: Callable, state: rx.State):
+    result = fn(state)
+    if inspect.isawaitable(result):
+        await result
+
+
+class ConcurrentLoadMixin(rx.State, mixin=True):
+    """Agrega ``run_loaders`` y ``reload_loaders`` al estado que lo hereda."""
+
+    @rx.event
+    async def run_loaders(self, names: list[str]):
+        """Ejecuta los loaders ``names`` del estado en paralelo.
+
+        Cada loader pide su propia conexión al pool, así que la carga tarda
+        lo que la consulta más lenta y no la suma de todas, y el cliente
+        recibe un único delta con todos los resultados. Un loader que falla
+        no impide que se apliquen los demás.
+        """
+        handlers = type(self).event_handlers
+        results = await asyncio.gather(
+            *(_call(handlers[name].fn, self) for name in names),
+            return_exceptions=True,
+        )
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                print(f"❌ Error en {name}: {result}")
+
+    def _apply_updates(self, updates: dict):
+        """Aplica los campos que devolvió la consulta de un loader."""
+        for name, value in updates.items():
+            setattr(self, name, value)
+
+    @rx.event(background=True)
+    async def reload_loaders(self, names: list[str]):
+        """Recarga loaders con debounce, juntando los pedidos de la sesión.
+
+        Cada pedido nuevo suma sus loaders a los pendientes y cancela la
+        recarga anterior, tanto si está esperando el debounce como si sus
+        consultas siguen en curso (asyncpg las cancela en el servidor). Así
+        cada loader corre una sola vez, y sólo con la última combinación de
+        filtros. Las consultas corren fuera del lock del estado, en paralelo.
+        """
+        key = (self.router.session.client_token, self.get_full_name())
+        _pending_loaders.setdefault(key, set()).update(names)
+        previous = _reload_tasks.get(key)
+        if previous is not None:
+            previous.cancel()
+        task = asyncio.current_task()
+        _reload_tasks[key] = task
+        try:
+            await asyncio.sleep(RELOAD_DEBOUNCE)
+            # Los pedidos que lleguen durante las consultas quedan para la
+            # recarga siguiente en vez de perderse al aplicar esta.
+            pending = sorted(_pending_loaders.pop(key, ()))
+            try:
+                results = await asyncio.gather(
+                    *(getattr(self, f"_{name}")() for name in pending),
+                    return_exceptions=True,
+                )
+            except asyncio.CancelledError:
+                # La recarga que canceló a esta los corre con los filtros nuevos.
+                _pending_loaders.setdefault(key, set()).update(pending)
+                raise
+            # A partir de acá la recarga ya no se cancela: una nueva no debe
+            # interrumpirla mientras espera el lock o aplica los resultados.
+            if _reload_tasks.get(key) is task:
+                del _reload_tasks[key]
+            async with self:
+                for name, result in zip(pending, results):
+                    if isinstance(result, Exception):
+                        print(f"❌ Error en {name}: {result}")
+                    else:
+                        self._apply_updates(result)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if _reload_tasks.get(key) is task:
+                del _reload_tasks[key]
+
+
+def gather_loaders(on_load) -> list:
+    """Agrupa los handlers de ``on_load`` en un ``run_loaders`` por estado.
+
+    Los eventos de estados sin el mixin, o que no son handlers simples
+    (por ejemplo con argumentos), se dejan como estaban.
+    """
+    handlers = on_load if isinstance(on_load, list) else [on_load]
+    groups: dict[type[rx.State], list[str]] = {}
+    events = []
+    for handler in handlers:
+        if isinstance(handler, EventHandler):
+            state = rx.State.get_class_substate(handler.state_full_name)
+            if "run_loaders" in state.event_handlers:
+                groups.setdefault(state, []).append(handler.fn.__name__)
+                continue
+        events.append(handler)
+    return [state.run_loaders(names) for state, names in groups.items()] + events
@@ -0,0 +1,264 @@
+"""Métricas del dashboard en formato de texto de Prometheus.
+
+Con ``METRICS_ENABLED=1`` la app registra, por proceso:
+
+- ``dashboard_event_duration_seconds{handler,page}``: latencia de cada
+  handler de los estados instrumentados (``instrument_states``); el
+  ``_count`` del histograma es la cantidad de llamadas.
+- ``dashboard_event_errors_total{handler}``: handlers que lanzaron una
+  excepción.
+- ``dashboard_state_delta_bytes{handler}``: tamaño del delta que se envía
+  al navegador después de cada evento (``MetricsMiddleware``).
+- ``dashboard_db_acquire_seconds``: espera para obtener una conexión del
+  pool (``db.acquire``).
+- ``dashboard_db_query_seconds{kind}`` y ``dashboard_db_rows{kind}``:
+  duración y filas de cada consulta (``db.InstrumentedConnection``).
+- ``dashboard_db_pool_size`` / ``dashboard_db_pool_idle``: conexiones
+  abiertas y libres al momento de leer las métricas.
+
+Todo se expone en ``GET /metrics`` (``metrics_api``). Sin la variable no
+se instrumenta nada y el endpoint no existe.
+"""
+
+import dataclasses
+import functools
+import inspect
+import math
+import os
+import time
+from typing import Callable, Iterable
+
+import asyncpg
+import reflex as rx
+from reflex.event import Event, EventHandler
+from reflex.middleware import Middleware
+from reflex.utils import format
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+ENABLED = os.getenv("METRICS_ENABLED", "0").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000)
+BYTE_BUCKETS = (256, 1024, 4096, 16_384, 65_536, 262_144, 1_048_576)
+
+# Métodos públicos que Reflex registra como handlers pero que los estados
+# usan como helpers dentro de otros handlers: no se miden aparte.
+_HELPERS = frozenset({"get_db_pool"})
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+
+class Histogram:
+    """Histograma acumulado por combinación de labels."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = (*buckets, math.inf)
+        # labels -> [cuenta por bucket..., suma, total]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels):
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                yield f"{self.name}_bucket{_labels(self.labels, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {_number(float(series[-2]))}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {series[-1]}"
+
+
+event_duration = Histogram(
+    "dashboard_event_duration_seconds", "Latencia de los handlers de eventos.", ("handler", "page")
+)
+event_errors = Counter(
+    "dashboard_event_errors_total", "Handlers que terminaron con una excepción.", ("handler",)
+)
+delta_bytes = Histogram(
+    "dashboard_state_delta_bytes", "Bytes del delta de estado enviado por evento.", ("handler",), BYTE_BUCKETS
+)
+acquire_wait = Histogram(
+    "dashboard_db_acquire_seconds", "Espera para obtener una conexión del pool."
+)
+query_duration = Histogram(
+    "dashboard_db_query_seconds", "Duración de las consultas a Postgres.", ("kind",)
+)
+query_rows = Histogram(
+    "dashboard_db_rows", "Filas devueltas por consulta.", ("kind",), ROW_BUCKETS
+)
+
+_METRICS = (event_duration, event_errors, delta_bytes, acquire_wait, query_duration, query_rows)
+
+
+def render(pools: Iterable[asyncpg.Pool] = ()) -> str:
+    """Todas las métricas en formato de texto de Prometheus."""
+    lines = [line for metric in _METRICS for line in metric.render()]
+    pools = list(pools)
+    for name, help, value in (
+        ("dashboard_db_pool_size", "Conexiones abiertas en el pool.", lambda p: p.get_size()),
+        ("dashboard_db_pool_idle", "Conexiones libres en el pool.", lambda p: p.get_idle_size()),
+    ):
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+        lines.append(f"{name} {sum(value(p) for p in pools)}")
+    return "\n".join(lines) + "\n"
+
+
+def _page(state) -> str:
+    try:
+        return state.router.url.path or "/"
+    except Exception:
+        return ""
+
+
+def _timed(fn: Callable, handler: str) -> Callable:
+    """Envuelve un handler conservando su tipo (sync, async o generador).
+
+    Un handler cancelado (por ejemplo una recarga reemplazada por otra)
+    cuenta su latencia pero no como error.
+    """
+
+    def observe(state, started: float):
+        event_duration.observe(time.perf_counter() - started, handler, _page(state))
+
+    if inspect.isasyncgenfunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                async for event in fn(self, *args, **kwargs):
+                    yield event
+            except Exception:
+                event_errors.inc(handler)
+                raise
+            finally:
+                observe(self, started)
+    elif inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(self, *args, **kwargs)
+            except Exception:
+                event_errors.inc(handler)
+                raise
+            finally:
+                observe(self, started)
+    else:
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(self, *args, **kwargs)
+            except Exception:
+                event_errors.inc(handler)
+                raise
+            finally:
+                observe(self, started)
+
+    wrapper._metrics_handler = handler
+    return wrapper
+
+
+def instrument_states(*states: type[rx.State]):
+    """Mide la latencia de todos los handlers de ``states``.
+
+    Reemplaza cada ``EventHandler`` del registro del estado por una copia
+    cuyo ``fn`` está cronometrado; el resto de la app no cambia.
+    """
+    for state in states:
+        for name, handler in list(state.event_handlers.items()):
+            # setvar y otros handlers especiales de Reflex quedan afuera.
+            if (
+                name in _HELPERS
+                or type(handler) is not EventHandler
+                or hasattr(handler.fn, "_metrics_handler")
+            ):
+                continue
+            state.event_handlers[name] = dataclasses.replace(
+                handler, fn=_timed(handler.fn, f"{state.__name__}.{name}")
+            )
+
+
+@functools.lru_cache(maxsize=256)
+def _handler_label(event_name: str) -> str:
+    path, _, name = event_name.rpartition(".")
+    try:
+        return f"{rx.State.get_class_substate(path).__name__}.{name}"
+    except Exception:
+        return name
+
+
+class MetricsMiddleware(Middleware):
+    """Registra el tamaño del delta que cada evento envía al navegador."""
+
+    async def preprocess(self, app, state, event: Event):
+        return None
+
+    async def postprocess(self, app, state, event: Event, update):
+        if update.delta:
+            size = len(format.json_dumps(update.delta).encode())
+            delta_bytes.observe(size, _handler_label(event.name))
+        return update
+
+
+async def _metrics_endpoint(request: Request) -> PlainTextResponse:
+    from .db import _pools
+
+    return PlainTextResponse(
+        render(_pools.values()), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def metrics_api() -> Starlette:
+    """App de Starlette con ``GET /metrics``, para ``rx.App(api_transformer=...)``."""
+    return Starlette(routes=[Route("/metrics", _metrics_endpoint)])
@@ -0,0 +1,637 @@
+"""Repositorio de las consultas fijas del dashboard.
+
+Cada consulta se declara una sola vez como ``Statement``: texto estable,
+con los valores siempre como parámetros, y los tipos de esos parámetros.
+Las combinaciones de filtros (año/mes/día "All" o un valor, columna y
+sentido del orden de la tabla, con o sin búsqueda) se resuelven a un
+conjunto fijo de statements armado al importar el módulo, así que por más
+sesiones y filtros distintos que haya, Postgres sólo ve esos textos.
+
+asyncpg prepara cada texto la primera vez que una conexión lo ejecuta y
+lo guarda en su caché de statements (``DB_STATEMENT_CACHE_SIZE``), así
+que el parse y el plan se pagan una vez por conexión y no en cada pedido.
+Las consultas siguen pasando por ``conn.fetch``, de modo que las métricas
+y el log de consultas (db.py) las ven igual que antes.
+
+Las tablas derivadas (rollups, KPIs por día y la tabla de búsqueda) se
+definen acá como el SELECT que calcula su contenido; backend/rollups.py
+las crea y refresca. Mientras falten o tengan una definición vieja
+(``derived_ready`` falso), cada consulta lee ese SELECT como subconsulta
+en lugar de la tabla: más lento, pero con el mismo resultado.
+"""
+
+import datetime
+import functools
+import itertools
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from asyncpg import Connection, Pool
+
+from .cache import cached_fetch, cached_fetchval
+
+
+@dataclass(frozen=True)
+class Statement:
+    """Consulta con texto fijo y tipos de sus parámetros ($1, $2, ...)."""
+
+    name: str
+    sql: str
+    params: tuple[type, ...] = ()
+
+    def bind(self, args: tuple) -> tuple:
+        if len(args) != len(self.params):
+            raise TypeError(f"{self.name} espera {len(self.params)} parámetros, recibió {len(args)}")
+        for i, (value, kind) in enumerate(zip(args, self.params), 1):
+            if not isinstance(value, kind):
+                raise TypeError(f"{self.name}: ${i} debe ser {kind.__name__}, no {type(value).__name__}")
+        return args
+
+
+# Joins compartidos por el snapshot, el modo servidor, los rollups y el motor.
+SALES_FROM = """
+    FROM gold.fact_sales f
+    LEFT JOIN gold.dim_customers c ON f.customer_key = c.customer_key
+    LEFT JOIN gold.dim_sellers s ON f.seller_key = s.seller_key
+    LEFT JOIN gold.dim_products p ON f.product_key = p.product_key
+    LEFT JOIN gold.dim_status st ON f.status_key = st.status_key
+    LEFT JOIN gold.dim_calendar cal ON f.date_purchase_key = cal.date_key
+"""
+
+SALES_COLUMNS = """
+    f.order_id,
+    f.order_item_id,
+    f.price,
+    f.freight_value,
+    f.total,
+    c.customer_city,
+    c.customer_state,
+    s.seller_city,
+    s.seller_state,
+    p.product_category_name,
+    p.product_weight_g,
+    st.status,
+    st.status_group,
+    cal.date_ymd as purchase_date,
+    cal.date_year as year,
+    cal.date_month as month,
+    cal.month_name
+"""
+
+# Tabla de la vista /table en modo servidor (la mantiene backend/rollups.py):
+# una fila por hecho con los campos de ``SALES_COLUMNS`` ya resueltos y el
+# texto de búsqueda, así cada página se lee sin joins.
+SEARCH_TABLE = "gold.fact_sales_search"
+
+# Columnas de ``SEARCH_TABLE`` que se muestran (los alias de SALES_COLUMNS).
+TABLE_COLUMNS = (
+    "order_id",
+    "order_item_id",
+    "price",
+    "freight_value",
+    "total",
+    "customer_city",
+    "customer_state",
+    "seller_city",
+    "seller_state",
+    "product_category_name",
+    "product_weight_g",
+    "status",
+    "status_group",
+    "purchase_date",
+    "year",
+    "month",
+    "month_name",
+)
+
+# Expresiones de orden sobre ``SEARCH_TABLE`` de las columnas ordenables en
+# modo servidor (las mismas opciones que ofrece el select de
+# views/table.py). Las que vienen de un LEFT JOIN se envuelven en COALESCE
+# para que la comparación de filas del keyset nunca vea NULL; rollups.py
+# crea un índice por expresión, seguida del desempate, así cada página es
+# un recorrido de índice desde la última clave vista.
+SORT_COLUMNS = {
+    "order_id": "order_id",
+    "total": "total",
+    "price": "price",
+    "purchase_date": "COALESCE(purchase_date, DATE '1900-01-01')",
+    "product_category_name": "COALESCE(product_category_name, '')",
+    "customer_state": "COALESCE(customer_state, '')",
+    "seller_state": "COALESCE(seller_state, '')",
+    "status_group": "COALESCE(status_group, '')",
+}
+
+# Desempate estable para el keyset: (order_id, order_item_id) identifica la fila.
+TIEBREAKER = ("order_id", "order_item_id")
+
+# Campos sobre los que busca el input de la tabla.
+SEARCH_COLUMNS = (
+    "f.order_id",
+    "c.customer_city",
+    "c.customer_state",
+    "s.seller_city",
+    "s.seller_state",
+    "p.product_category_name",
+    "st.status",
+    "st.status_group",
+    "cal.month_name",
+)
+
+# Hasta cuántas coincidencias se cuentan exacto antes de estimar.
+SEARCH_COUNT_CAP = 10_000
+
+
+# --- Tablas derivadas ---------------------------------------------------------
+
+# Columnas de calendario que comparten todos los rollups.
+_DAY_COLUMNS = "cal.date_key, cal.date_ymd, cal.date_year, cal.date_month, cal.date_day"
+
+# Joins internos del gráfico de líneas original (calendario, clientes y
+# productos), los mismos para sus tres pestañas: un hecho sin cliente o sin
+# producto no cuenta ni por estado, ni por ciudad, ni por categoría.
+_LINE_CHART_JOINS = """
+        JOIN gold.dim_customers c ON f.customer_key = c.customer_key
+        JOIN gold.dim_products p ON f.product_key = p.product_key
+"""
+
+# Nombre de la tabla -> (columnas de grupo además del día, joins). El
+# calendario lo unen todos; los demás joins son los de la consulta original
+# de cada gráfico.
+ROLLUPS = {
+    "gold.rollup_sales_day": ("", ""),
+    "gold.rollup_sales_day_state": ("c.customer_state", _LINE_CHART_JOINS),
+    "gold.rollup_sales_day_category": ("p.product_category_name", _LINE_CHART_JOINS),
+    "gold.rollup_sales_day_seller": (
+        "s.seller_id",
+        "JOIN gold.dim_sellers s ON f.seller_key = s.seller_key",
+    ),
+}
+
+# Totales por día de compra para los KPIs. Va directo sobre la tabla de
+# hechos (sin el JOIN al calendario) para contar también los hechos sin
+# fecha, como el KPI original. Cada orden se cuenta sólo en el primer día
+# en que aparece, así que sumar la columna da COUNT(DISTINCT order_id).
+KPI_TABLE = "gold.rollup_kpi_day"
+
+DERIVED_TABLES = (*ROLLUPS, KPI_TABLE, SEARCH_TABLE)
+
+
+def rollup_select(table: str, where: str = "") -> str:
+    """SELECT que calcula el contenido de un rollup (todo, o lo que cumpla ``where``)."""
+    group, joins = ROLLUPS[table]
+    columns = f"{_DAY_COLUMNS}, {group}" if group else _DAY_COLUMNS
+    return f"""
+        SELECT
+            {columns},
+            SUM(f.total) AS ventas,
+            COUNT(*) AS items
+        FROM gold.fact_sales f
+        JOIN gold.dim_calendar cal ON f.date_purchase_key = cal.date_key
+        {joins}
+        {f"WHERE {where}" if where else ""}
+        GROUP BY {columns}
+    """
+
+
+def _kpi_select(where: str = "") -> str:
+    # Con ``where`` sólo se miran las órdenes que tienen hechos nuevos; las
+    # que ya aparecían antes caen en un día que no se recalcula.
+    orders = (
+        f"f.order_id IN (SELECT f.order_id FROM gold.fact_sales f WHERE {where})"
+        if where
+        else "f.order_id IS NOT NULL"
+    )
+    return f"""
+        SELECT
+            d.date_purchase_key,
+            d.ventas,
+            COALESCE(o.orders, 0) AS orders
+        FROM (
+            SELECT f.date_purchase_key, SUM(f.total) AS ventas
+            FROM gold.fact_sales f
+            {f"WHERE {where}" if where else ""}
+            GROUP BY f.date_purchase_key
+        ) d
+        LEFT JOIN (
+            SELECT first_key, COUNT(*) AS orders
+            FROM (
+                SELECT f.order_id, MIN(f.date_purchase_key) AS first_key
+                FROM gold.fact_sales f
+                WHERE {orders}
+                GROUP BY f.order_id
+            ) firsts
+            GROUP BY first_key
+        ) o ON o.first_key IS NOT DISTINCT FROM d.date_purchase_key
+    """
+
+
+# Fila de la tabla de /table ya desnormalizada, más su texto de búsqueda en
+# minúsculas. Los campos se separan con el carácter de control US para que
+# un patrón no cruce de un campo a otro.
+def _search_select(where: str = "") -> str:
+    return f"""
+        SELECT
+            {SALES_COLUMNS},
+            lower(concat_ws(E'\\x1f', {", ".join(SEARCH_COLUMNS)})) AS search_text
+        {SALES_FROM}
+        {f"WHERE {where}" if where else ""}
+    """
+
+
+def derived_select(table: str, where: str = "") -> str:
+    """SELECT que calcula el contenido de una tabla derivada (todo, o lo que cumpla ``where``)."""
+    if table == SEARCH_TABLE:
+        return _search_select(where)
+    if table == KPI_TABLE:
+        return _kpi_select(where)
+    return rollup_select(table, where)
+
+
+# Si las tablas derivadas existen, con la definición actual, y ya se
+# llenaron. Lo mantiene ``rollups.rollup_lifespan``; hasta la primera
+# comprobación se asume que no.
+derived_ready = False
+
+_DERIVED_NAMES = re.compile(
+    r"\b(" + "|".join(re.escape(table) for table in DERIVED_TABLES) + r")\b"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def from_facts(sql: str) -> str:
+    """``sql`` con cada tabla derivada reemplazada por su SELECT sobre los hechos.
+
+    Las consultas siempre le ponen alias a las tablas derivadas, así que la
+    subconsulta lo conserva.
+    """
+    return _DERIVED_NAMES.sub(lambda match: f"({derived_select(match.group(1))})", sql)
+
+
+def _sql(statement: Statement) -> str:
+    """Texto a ejecutar de ``statement`` según si las tablas derivadas están listas."""
+    return statement.sql if derived_ready else from_facts(statement.sql)
+
+
+def date_range(
+    year: int | None, month: int | None = None, day: int | None = None
+) -> tuple[datetime.date, datetime.date] | None:
+    """Rango ``[desde, hasta)`` de fechas equivalente a los selectores.
+
+    Devuelve ``None`` si no hay filtro o si la selección no es un tramo
+    contiguo (un mes de todos los años, un día de todos los meses) o no
+    existe (30 de febrero).
+    """
+    if year is None or (month is None and day is not None):
+        return None
+    try:
+        if month is None:
+            return datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+        if day is None:
+            start = datetime.date(year, month, 1)
+            return start, datetime.date(year + month // 12, month % 12 + 1, 1)
+        start = datetime.date(year, month, day)
+    except ValueError:
+        return None
+    return start, start + datetime.timedelta(days=1)
+
+
+def _filtered(name: str, template: str, columns: tuple[str, ...]) -> dict[Any, Statement]:
+    """Variantes de ``template`` para los selectores de fecha ``columns``.
+
+    Las selecciones contiguas usan una sola variante, ``"range"``, con
+    ``date_ymd >= $1 AND date_ymd < $2``, que aprovecha el índice por
+    fecha del rollup y sólo lee los días del rango. El resto (sin filtro, o
+    combinaciones sin rango como "agosto de todos los años") tiene una
+    variante por combinación de columnas filtradas, con igualdad sobre
+    cada una; la clave indica qué columnas se filtran.
+    """
+    variants: dict[Any, Statement] = {
+        "range": Statement(
+            f"{name}[range]",
+            template.format(where="WHERE date_ymd >= $1::date AND date_ymd < $2::date"),
+            (datetime.date, datetime.date),
+        )
+    }
+    for mask in itertools.product((False, True), repeat=len(columns)):
+        active = [column for column, on in zip(columns, mask) if on]
+        where = " AND ".join(f"{column} = ${i}::int" for i, column in enumerate(active, 1))
+        variants[mask] = Statement(
+            f"{name}[{','.join(active) or 'all'}]",
+            template.format(where=f"WHERE {where}" if where else ""),
+            (int,) * len(active),
+        )
+    return variants
+
+
+def _pick(variants: dict[Any, Statement], *values: int | None) -> tuple[Statement, tuple]:
+    if bounds := date_range(*values):
+        return variants["range"], bounds
+    statement = variants[tuple(value is not None for value in values)]
+    return statement, tuple(value for value in values if value is not None)
+
+
+# --- Gráficos -----------------------------------------------------------------
+
+# Estado y categoría salen de los rollups diarios; ciudad no tiene rollup
+# propio y se agrega sobre la tabla de hechos, con los mismos joins
+# (``_LINE_CHART_JOINS``). Ahí las fechas se traducen a un rango de
+# ``date_purchase_key`` (las claves del calendario crecen con la fecha, como
+# ya asume la marca de agua de rollups.py), así el índice de la tabla de
+# hechos descarta los días fuera de rango antes de los JOIN.
+LINE_CHART = {
+    "estado": Statement(
+        "line_chart[estado]",
+        """
+        SELECT customer_state AS label, SUM(ventas) AS ventas
+        FROM gold.rollup_sales_day_state r
+        WHERE date_ymd >= $1::date AND date_ymd <= $2::date
+        GROUP BY label
+        ORDER BY ventas DESC
+        LIMIT 10
+        """,
+        (datetime.date, datetime.date),
+    ),
+    "categoria": Statement(
+        "line_chart[categoria]",
+        """
+        SELECT product_category_name AS label, SUM(ventas) AS ventas
+        FROM gold.rollup_sales_day_category r
+        WHERE date_ymd >= $1::date AND date_ymd <= $2::date
+        GROUP BY label
+        ORDER BY ventas DESC
+        LIMIT 10
+        """,
+        (datetime.date, datetime.date),
+    ),
+    "ciudad": Statement(
+        "line_chart[ciudad]",
+        """
+        SELECT c.customer_city AS label, SUM(f.total) AS ventas
+        FROM gold.fact_sales f
+        JOIN gold.dim_calendar cal ON f.date_purchase_key = cal.date_key
+        JOIN gold.dim_customers c ON f.customer_key = c.customer_key
+        JOIN gold.dim_products p ON f.product_key = p.product_key
+        WHERE f.date_purchase_key >= (
+                SELECT MIN(date_key) FROM gold.dim_calendar WHERE date_ymd >= $1::date
+            )
+          AND f.date_purchase_key <= (
+                SELECT MAX(date_key) FROM gold.dim_calendar WHERE date_ymd <= $2::date
+            )
+        GROUP BY label
+        ORDER BY ventas DESC
+        LIMIT 10
+        """,
+        (datetime.date, datetime.date),
+    ),
+}
+
+SALES_BY_DAY = _filtered(
+    "sales_by_day",
+    """
+    SELECT date_ymd AS date, ventas
+    FROM gold.rollup_sales_day r
+    {where}
+    ORDER BY date_ymd
+    """,
+    ("date_year", "date_month", "date_day"),
+)
+
+SALES_BY_YEAR = Statement(
+    "sales_by_year",
+    """
+    SELECT date_year, SUM(ventas) AS ventas
+    FROM gold.rollup_sales_day r
+    GROUP BY date_year
+    ORDER BY date_year
+    """,
+)
+
+SALES_BY_MONTH = _filtered(
+    "sales_by_month",
+    """
+    SELECT date_year, date_month, SUM(ventas) AS ventas
+    FROM gold.rollup_sales_day r
+    {where}
+    GROUP BY date_year, date_month
+    ORDER BY date_year, date_month
+    """,
+    ("date_year", "date_month"),
+)
+
+TOP_SELLERS = _filtered(
+    "top_sellers",
+    """
+    SELECT seller_id, SUM(ventas) AS ventas
+    FROM gold.rollup_sales_day_seller r
+    {where}
+    GROUP BY seller_id
+    ORDER BY ventas DESC
+    LIMIT 10
+    """,
+    ("date_year",),
+)
+
+CUSTOMER_COUNT = Statement("customer_count", "SELECT COUNT(*) FROM gold.dim_customers")
+
+# Clientes, ventas y órdenes distintas de las tarjetas de KPIs en un round
+# trip; ventas y órdenes se suman de los totales por día (``KPI_TABLE``).
+KPIS = Statement(
+    "kpis",
+    f"""
+    SELECT
+        (SELECT COUNT(*) FROM gold.dim_customers) AS customers,
+        SUM(ventas) AS sales,
+        SUM(orders)::bigint AS orders
+    FROM {KPI_TABLE} k
+    """,
+)
+
+# Hechos desnormalizados del motor analítico (backend/engine.py), con una
+# marca por dimensión de si la fila tiene su registro.
+_ENGINE_SELECT = f"""
+    SELECT
+        f.order_id,
+        f.date_purchase_key,
+        f.total,
+        c.customer_city,
+        c.customer_state,
+        p.product_category_name,
+        s.seller_id,
+        cal.date_ymd,
+        cal.date_year,
+        cal.date_month,
+        cal.date_day,
+        c.customer_key IS NOT NULL AS has_customer,
+        p.product_key IS NOT NULL AS has_product,
+        s.seller_key IS NOT NULL AS has_seller
+    {SALES_FROM}
+"""
+
+ENGINE_FACTS = Statement("engine_facts", _ENGINE_SELECT)
+
+# Hechos desde la marca de agua ($1); los que no tienen fecha se releen siempre.
+ENGINE_NEW_FACTS = Statement(
+    "engine_facts[since]",
+    _ENGINE_SELECT + " WHERE f.date_purchase_key >= $1::int OR f.date_purchase_key IS NULL",
+    (int,),
+)
+
+
+async def line_chart(source: Pool | Connection, tab: str, start: datetime.date, end: datetime.date) -> list[dict]:
+    """Top 10 de ventas por estado, ciudad o categoría entre dos fechas."""
+    statement = LINE_CHART[tab]
+    return await cached_fetch(source, _sql(statement), *statement.bind((start, end)))
+
+
+async def sales_by_day(
+    source: Pool | Connection, year: int | None = None, month: int | None = None, day: int | None = None
+) -> list[dict]:
+    """Ventas diarias; ``None`` es "All"."""
+    statement, args = _pick(SALES_BY_DAY, year, month, day)
+    return await cached_fetch(source, _sql(statement), *statement.bind(args))
+
+
+async def sales_by_year(source: Pool | Connection) -> list[dict]:
+    return await cached_fetch(source, _sql(SALES_BY_YEAR))
+
+
+async def sales_by_month(source: Pool | Connection, year: int | None = None, month: int | None = None) -> list[dict]:
+    """Ventas por mes; ``None`` es "All"."""
+    statement, args = _pick(SALES_BY_MONTH, year, month)
+    return await cached_fetch(source, _sql(statement), *statement.bind(args))
+
+
+async def top_sellers(source: Pool | Connection, year: int | None = None) -> list[dict]:
+    """Los 10 vendedores con más ventas; ``None`` es "All"."""
+    statement, args = _pick(TOP_SELLERS, year)
+    return await cached_fetch(source, _sql(statement), *statement.bind(args))
+
+
+async def customer_count(source: Pool | Connection) -> int:
+    return await cached_fetchval(source, CUSTOMER_COUNT.sql) or 0
+
+
+async def kpis(source: Pool | Connection) -> dict:
+    """Fila de ``KPIS``: customers, sales y orders."""
+    return (await cached_fetch(source, _sql(KPIS)))[0]
+
+
+# --- Tabla --------------------------------------------------------------------
+
+SNAPSHOT = Statement(
+    "snapshot",
+    f"""
+    SELECT {SALES_COLUMNS}
+    {SALES_FROM}
+    ORDER BY cal.date_ymd DESC
+    LIMIT $1::int
+    """,
+    (int,),
+)
+
+FACT_COUNT = Statement("fact_count", "SELECT COUNT(*) FROM gold.fact_sales")
+
+SEARCH_COUNT = Statement(
+    "search_count",
+    f"""
+    SELECT COUNT(*) FROM (
+        SELECT 1 FROM {SEARCH_TABLE} fs WHERE fs.search_text LIKE $1::text LIMIT {SEARCH_COUNT_CAP + 1}
+    ) t
+    """,
+    (str,),
+)
+
+SEARCH_ESTIMATE = Statement(
+    "search_estimate",
+    f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {SEARCH_TABLE} fs WHERE fs.search_text LIKE $1::text",
+    (str,),
+)
+
+
+def _page_statement(sort: str, descending: bool, search: bool, seek: bool) -> Statement:
+    """Página con seek sobre (orden, order_id, order_item_id).
+
+    Parámetros, en orden: el patrón de búsqueda (si ``search``), la clave
+    de la última fila vista (si ``seek``) y el límite.
+    """
+    sort_expr = SORT_COLUMNS[sort]
+    key_columns = (sort_expr, *TIEBREAKER)
+    params: list[type] = []
+    conditions = []
+    if search:
+        params.append(str)
+        conditions.append(f"search_text LIKE ${len(params)}::text")
+    if seek:
+        params += [object, str, int]
+        placeholders = ", ".join(f"${i}" for i in range(len(params) - 2, len(params) + 1))
+        operator = "<" if descending else ">"
+        conditions.append(f"({', '.join(key_columns)}) {operator} ({placeholders})")
+    params.append(int)
+
+    where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+    direction = "DESC" if descending else "ASC"
+    order_clause = ", ".join(f"{column} {direction}" for column in key_columns)
+    return Statement(
+        f"sales_page[{sort},{direction.lower()}{',search' if search else ''}{',seek' if seek else ''}]",
+        f"""
+        SELECT {", ".join(TABLE_COLUMNS)}, {sort_expr} AS sort_key
+        FROM {SEARCH_TABLE} fs
+        {where_clause}
+        ORDER BY {order_clause}
+        LIMIT ${len(params)}::int
+        """,
+        tuple(params),
+    )
+
+
+SALES_PAGE = {
+    key: _page_statement(*key)
+    for key in itertools.product(SORT_COLUMNS, (False, True), (False, True), (False, True))
+}
+
+
+async def sales_page(
+    conn: Connection,
+    sort: str,
+    descending: bool,
+    limit: int,
+    pattern: str | None = None,
+    key: tuple[Any, str, int] = (),
+) -> list:
+    """Una página de la tabla en el orden pedido, sin pasar por la caché."""
+    statement = SALES_PAGE[(sort, descending, pattern is not None, bool(key))]
+    args = ((pattern,) if pattern is not None else ()) + tuple(key) + (limit,)
+    return await conn.fetch(_sql(statement), *statement.bind(args))
+
+
+async def fact_count(source: Pool | Connection) -> int:
+    return await cached_fetchval(source, FACT_COUNT.sql) or 0
+
+
+async def search_count(source: Pool | Connection, pattern: str) -> int:
+    """Coincidencias de ``pattern``, contadas hasta ``SEARCH_COUNT_CAP + 1``."""
+    return await cached_fetchval(source, _sql(SEARCH_COUNT), *SEARCH_COUNT.bind((pattern,)))
+
+
+async def search_estimate(source: Pool | Connection, pattern: str) -> str:
+    """Plan en JSON de la búsqueda, para leer la estimación de filas."""
+    return await cached_fetchval(source, _sql(SEARCH_ESTIMATE), *SEARCH_ESTIMATE.bind((pattern,)))
+
+
+STATEMENTS = (
+    *LINE_CHART.values(),
+    *SALES_BY_DAY.values(),
+    SALES_BY_YEAR,
+    *SALES_BY_MONTH.values(),
+    *TOP_SELLERS.values(),
+    CUSTOMER_COUNT,
+    KPIS,
+    ENGINE_FACTS,
+    ENGINE_NEW_FACTS,
+    SNAPSHOT,
+    FACT_COUNT,
+    SEARCH_COUNT,
+    SEARCH_ESTIMATE,
+    *SALES_PAGE.values(),
+)
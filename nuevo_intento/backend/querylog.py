@@ -0,0 +1,197 @@
+"""Estadísticas por consulta y log de consultas lentas.
+
+Con ``QUERY_LOG_ENABLED=1`` cada consulta que llega a Postgres (las que
+resuelve la caché no cuentan) se agrupa por huella: el SQL normalizado con
+los literales reemplazados por ``?``. Así cada combinación de tabla, campo
+de agrupación y filtros que arman los loaders con f-strings queda como una
+entrada propia, al estilo de ``pg_stat_statements``, con llamadas, tiempo
+total, media, desvío, máximo y filas.
+
+Cuando una ejecución supera ``SLOW_QUERY_MS`` se registra en
+``SLOW_QUERY_LOG`` (una línea JSON por evento) y, como mucho una vez cada
+``SLOW_QUERY_EXPLAIN_INTERVAL`` segundos por huella, se vuelve a correr con
+``EXPLAIN (ANALYZE, BUFFERS)`` en una transacción de sólo lectura para
+guardar el plan junto al evento. Sólo se explican ``SELECT`` y ``WITH``.
+El evento guarda la huella y los tipos de los argumentos, no sus valores
+(pueden traer lo que la gente escribe en el buscador), y los planes se
+guardan con los literales de texto reemplazados por ``?``.
+
+El reporte (``top_queries``) se ve en la página ``/queries``, que sólo
+existe con ``QUERY_REPORT_ENABLED=1``: muestra SQL y planes de la base,
+así que es para desarrollo o un despliegue de administración.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import time
+
+ENABLED = os.getenv("QUERY_LOG_ENABLED", "0").lower() in ("1", "true", "yes")
+
+# Página /queries con el reporte y los planes (desarrollo o administración).
+REPORT_ENABLED = os.getenv("QUERY_REPORT_ENABLED", "0").lower() in ("1", "true", "yes")
+
+# Umbral (ms) desde el que una consulta se considera lenta.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+
+# Mínimo de segundos entre dos EXPLAIN de la misma huella.
+EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "600"))
+
+# Archivo JSON Lines con los eventos de consultas lentas.
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "slow_queries.jsonl")
+
+# Huellas distintas que se guardan; al llenarse se descarta la de menos llamadas.
+MAX_FINGERPRINTS = 500
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:\?, )*\?\)", re.IGNORECASE)
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+def fingerprint(query: str) -> str:
+    """SQL normalizado sin literales: dos consultas con la misma forma
+    y distintos valores comparten huella."""
+    text = _WHITESPACE.sub(" ", query).strip().rstrip(";").strip()
+    text = _STRING.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    return _IN_LIST.sub("IN (...)", text)
+
+
+def query_id(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+class QueryStats:
+    """Acumulados de una huella; media y desvío con el método de Welford."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow_calls = 0
+        self.mean_ms = 0.0
+        self._m2 = 0.0
+        self.last_explain_at = 0.0
+        self.plan: str | None = None
+
+    def add(self, elapsed_ms: float, rows: int):
+        self.calls += 1
+        self.rows += rows
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        delta = elapsed_ms - self.mean_ms
+        self.mean_ms += delta / self.calls
+        self._m2 += delta * (elapsed_ms - self.mean_ms)
+
+    @property
+    def stddev_ms(self) -> float:
+        return math.sqrt(self._m2 / self.calls) if self.calls else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "queryid": query_id(self.text),
+            "query": self.text,
+            "calls": self.calls,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.mean_ms, 2),
+            "stddev_ms": round(self.stddev_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "slow_calls": self.slow_calls,
+            "plan": self.plan,
+        }
+
+
+_stats: dict[str, QueryStats] = {}
+# EXPLAIN y escrituras del log en curso (se guarda la referencia hasta que terminan).
+_tasks: set[asyncio.Task] = set()
+
+
+def _spawn(coro):
+    task = asyncio.ensure_future(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def record(query: str, args: tuple, elapsed_ms: float, rows: int):
+    """Suma una ejecución a su huella y dispara el log si fue lenta."""
+    if query.lstrip()[:7].upper() == "EXPLAIN":
+        return
+    text = fingerprint(query)
+    stats = _stats.get(text)
+    if stats is None:
+        if len(_stats) >= MAX_FINGERPRINTS:
+            del _stats[min(_stats, key=lambda key: _stats[key].calls)]
+        stats = _stats[text] = QueryStats(text)
+    stats.add(elapsed_ms, rows)
+
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+    stats.slow_calls += 1
+    print(f"⚠️ Consulta lenta ({elapsed_ms:.0f} ms) {query_id(text)}: {text[:120]}")
+
+    event = {
+        "ts": time.time(),
+        "queryid": query_id(text),
+        "fingerprint": text,
+        "elapsed_ms": round(elapsed_ms, 2),
+        "rows": rows,
+        "arg_types": [type(arg).__name__ for arg in args],
+        "plan": None,
+    }
+    now = time.monotonic()
+    if _EXPLAINABLE.match(query) and now - stats.last_explain_at >= EXPLAIN_INTERVAL:
+        stats.last_explain_at = now
+        _spawn(_explain(stats, query, args, event))
+    else:
+        _spawn(_write(event))
+
+
+async def _explain(stats: QueryStats, query: str, args: tuple, event: dict):
+    """Captura el plan real de la consulta lenta y escribe el evento."""
+    from .db import get_pool
+
+    try:
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction(readonly=True):
+                rows = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {query}", *args)
+        # Con un plan a medida Postgres muestra los valores enlazados.
+        stats.plan = _STRING.sub("?", "\n".join(row[0] for row in rows))
+        event["plan"] = stats.plan
+    except Exception as e:
+        event["plan_error"] = str(e)
+        print(f"❌ No se pudo obtener el EXPLAIN de {event['queryid']}: {e}")
+    await _write(event)
+
+
+def _append(line: str):
+    with open(SLOW_QUERY_LOG, "a", encoding="utf-8") as log:
+        log.write(line)
+
+
+async def _write(event: dict):
+    """Agrega el evento al log desde un hilo, sin bloquear el event loop."""
+    try:
+        await asyncio.to_thread(_append, json.dumps(event, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"❌ No se pudo escribir {SLOW_QUERY_LOG}: {e}")
+
+
+def top_queries(limit: int = 20, order: str = "total_ms") -> list[dict]:
+    """Huellas ordenadas por ``order`` (``total_ms``, ``mean_ms``, ``max_ms``,
+    ``calls`` o ``slow_calls``), de mayor a menor."""
+    rows = [stats.as_dict() for stats in _stats.values()]
+    rows.sort(key=lambda row: row[order], reverse=True)
+    return rows[:limit]
+
+
+def reset():
+    _stats.clear()
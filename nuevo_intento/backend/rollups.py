@@ -0,0 +1,324 @@
+"""Tablas derivadas de la capa gold que mantiene el dashboard.
+
+Los gráficos temporales y los rankings leen de tablas resumen de grano
+diario en lugar de re-agregar ``gold.fact_sales`` en cada visita, y /table
+pagina sobre una copia desnormalizada de los hechos, con un índice por
+columna ordenable y el texto de cada fila indexado con ``pg_trgm``. Sus
+definiciones están en backend/queries.py. Se migran (``migrate_rollups``:
+extensión, tablas e índices) y se reconstruyen después de cada corrida del
+ETL con::
+
+    python -m nuevo_intento.backend.rollups [--incremental]
+
+La app nunca ejecuta DDL: ``rollup_lifespan`` sólo comprueba la versión de
+cada tabla y, mientras alguna falte o esté vieja, las consultas leen de
+``gold.fact_sales`` (``queries.derived_ready``).
+
+Cada refresco guarda como marca de agua el mayor ``date_purchase_key`` de
+``gold.fact_sales``. El modo incremental sólo re-agrega los hechos desde
+ese día (inclusive, por si el último día estaba a medio cargar), así que
+cuesta lo que el lote nuevo y no toda la historia. Hechos que el ETL
+corrija con fechas anteriores a la marca requieren un refresco completo.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import os
+
+from asyncpg import Pool
+
+from . import queries
+from .cache import query_cache
+from .db import close_pools, get_pool
+from .queries import (
+    DERIVED_TABLES,
+    KPI_TABLE,
+    SEARCH_TABLE,
+    SORT_COLUMNS,
+    TIEBREAKER,
+    derived_select,
+)
+
+# Segundos entre comprobaciones de las tablas derivadas en la app.
+CHECK_INTERVAL = float(os.getenv("ROLLUP_CHECK_INTERVAL", "60"))
+
+# Marca de agua de los refrescos: nombre -> último valor procesado.
+WATERMARK_TABLE = "gold.rollup_watermark"
+_WATERMARK = "fact_sales.date_purchase_key"
+
+# La marca de agua, el modo incremental y los filtros por rango de fecha de
+# los gráficos filtran los hechos por ``date_purchase_key``. La tabla es del
+# ETL, así que el índice es una migración suya; la CLI lo crea si falta.
+FACT_INDEX = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS fact_sales_date_purchase_key_idx "
+    "ON gold.fact_sales (date_purchase_key)"
+)
+
+# Si ya se comprobaron las tablas una vez (para avisar al arrancar).
+_checked = False
+
+# Clave del advisory lock para que dos migraciones o refrescos no corran a la vez.
+_LOCK_KEY = 7_413_001
+
+# Hechos nuevos desde la marca de agua ($1). Los hechos sin fecha no tienen
+# marca, así que se recalculan siempre (usa el índice); los rollups igual
+# los descartan en el JOIN al calendario.
+_NEW_FACTS = "(f.date_purchase_key >= $1 OR f.date_purchase_key IS NULL)"
+
+
+def _delete_since(table: str) -> str:
+    """DELETE de las filas de ``table`` que el modo incremental recalcula."""
+    if table == SEARCH_TABLE:
+        return f"""
+            DELETE FROM {table} fs
+            USING gold.fact_sales f
+            WHERE fs.order_id = f.order_id
+              AND fs.order_item_id = f.order_item_id
+              AND {_NEW_FACTS}
+        """
+    if table == KPI_TABLE:
+        return f"DELETE FROM {table} f WHERE {_NEW_FACTS}"
+    return f"DELETE FROM {table} WHERE date_key >= $1"
+
+
+def _table_indexes(table: str, trgm: bool) -> list[str]:
+    name = table.split(".")[-1]
+    if table == SEARCH_TABLE:
+        # Uno por columna ordenable, con el desempate del keyset detrás; el
+        # de la clave sirve también para ordenar por order_id.
+        indexes = [
+            f"CREATE INDEX IF NOT EXISTS {name}_key_idx ON {table} ({', '.join(TIEBREAKER)})",
+        ]
+        for sort, expr in SORT_COLUMNS.items():
+            if sort not in TIEBREAKER:
+                indexes.append(
+                    f"CREATE INDEX IF NOT EXISTS {name}_{sort}_idx ON {table} "
+                    f"(({expr}), {', '.join(TIEBREAKER)})"
+                )
+        if trgm:
+            indexes.append(
+                f"CREATE INDEX IF NOT EXISTS {name}_trgm_idx ON {table} "
+                "USING gin (search_text gin_trgm_ops)"
+            )
+        return indexes
+    if table == KPI_TABLE:
+        return [f"CREATE INDEX IF NOT EXISTS {name}_date_idx ON {table} (date_purchase_key)"]
+    return [
+        f"CREATE INDEX IF NOT EXISTS {name}_date_idx ON {table} (date_ymd)",
+        f"CREATE INDEX IF NOT EXISTS {name}_key_idx ON {table} (date_key)",
+    ]
+
+
+def _table_version(table: str) -> str:
+    """Huella del SELECT que define ``table``; cambia si cambian sus columnas."""
+    return hashlib.sha1(" ".join(derived_select(table).split()).encode()).hexdigest()[:16]
+
+
+async def _is_current(conn, table: str) -> bool:
+    """Si ``table`` existe y fue creada con la definición actual."""
+    version = await conn.fetchval(
+        "SELECT obj_description(to_regclass($1), 'pg_class')", table
+    )
+    return version == _table_version(table)
+
+
+async def _create_table(conn, table: str, trgm: bool) -> bool:
+    """Crea ``table`` si falta o está desactualizada; devuelve si la (re)creó.
+
+    La versión se guarda como comentario de la tabla. Una tabla de una
+    versión anterior se borra y se vuelve a crear vacía.
+    """
+    created = not await _is_current(conn, table)
+    if created:
+        await conn.execute(f"DROP TABLE IF EXISTS {table}")
+        await conn.execute(f"CREATE TABLE {table} AS {derived_select(table)} WITH NO DATA")
+        await conn.execute(f"COMMENT ON TABLE {table} IS '{_table_version(table)}'")
+    for ddl in _table_indexes(table, trgm):
+        await conn.execute(ddl)
+    return created
+
+
+async def _enable_trgm(conn) -> bool:
+    """Activa pg_trgm si el servidor lo tiene.
+
+    Sin la extensión la búsqueda sigue funcionando, pero recorre la tabla
+    de búsqueda entera en lugar de usar el índice.
+    """
+    try:
+        async with conn.transaction():
+            await conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        return True
+    except Exception as e:
+        print(f"⚠️ pg_trgm no disponible, la búsqueda no tendrá índice: {e}")
+        return False
+
+
+async def migrate_rollups(pool: Pool):
+    """Crea la extensión, las tablas derivadas que falten y sus índices.
+
+    Una tabla que cambió de definición se recrea vacía y se borra la marca
+    de agua, así el próximo refresco es completo y, hasta entonces, la app
+    sigue leyendo de los hechos. Sólo corre desde la CLI.
+    """
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", _LOCK_KEY)
+            trgm = await _enable_trgm(conn)
+            await conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+                    name text PRIMARY KEY,
+                    value bigint,
+                    refreshed_at timestamptz NOT NULL DEFAULT now()
+                )
+                """
+            )
+            created = [table for table in DERIVED_TABLES if await _create_table(conn, table, trgm)]
+            if created:
+                print(f"🔧 Tablas derivadas creadas: {', '.join(created)}")
+                await conn.execute(f"DELETE FROM {WATERMARK_TABLE} WHERE name = $1", _WATERMARK)
+    await ensure_fact_index(pool)
+
+
+async def ensure_fact_index(pool: Pool):
+    """Crea ``FACT_INDEX`` sin bloquear las escrituras del ETL.
+
+    ``CONCURRENTLY`` no puede ir dentro de una transacción, así que corre
+    aparte de la migración de las tablas.
+    """
+    async with pool.acquire() as conn:
+        await conn.execute(FACT_INDEX)
+
+
+async def get_watermark(conn) -> int | None:
+    """Último ``date_purchase_key`` incorporado a las tablas derivadas."""
+    if await conn.fetchval("SELECT to_regclass($1)", WATERMARK_TABLE) is None:
+        return None
+    return await conn.fetchval(
+        f"SELECT value FROM {WATERMARK_TABLE} WHERE name = $1", _WATERMARK
+    )
+
+
+async def _set_watermark(conn, value: int | None):
+    await conn.execute(
+        f"""
+        INSERT INTO {WATERMARK_TABLE} (name, value, refreshed_at) VALUES ($1, $2, now())
+        ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value, refreshed_at = now()
+        """,
+        _WATERMARK,
+        value,
+    )
+
+
+async def _missing(conn) -> list[str]:
+    return [table for table in DERIVED_TABLES if not await _is_current(conn, table)]
+
+
+async def refresh_rollups(pool: Pool, incremental: bool = False):
+    """Reconstruye los rollups y la tabla de búsqueda en una sola transacción.
+
+    Se usa DELETE en lugar de TRUNCATE para que las lecturas concurrentes
+    sigan viendo los datos anteriores hasta el commit. Con ``incremental``
+    sólo se re-agregan los hechos desde la marca de agua; si todavía no hay
+    marca (primera carga, o la migración recreó alguna tabla) se hace el
+    refresco completo. Las tablas tienen que estar migradas.
+    """
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", _LOCK_KEY)
+            if missing := await _missing(conn):
+                raise RuntimeError(
+                    f"Tablas derivadas sin migrar: {', '.join(missing)} (corre migrate_rollups)"
+                )
+            since = await get_watermark(conn) if incremental else None
+            # Se toma antes de leer los hechos: lo que llegue durante el
+            # refresco entra en el próximo, que re-agrega desde este día.
+            watermark = await conn.fetchval("SELECT MAX(date_purchase_key) FROM gold.fact_sales")
+            for table in DERIVED_TABLES:
+                if since is None:
+                    await conn.execute(f"DELETE FROM {table}")
+                    await conn.execute(f"INSERT INTO {table} {derived_select(table)}")
+                else:
+                    await conn.execute(_delete_since(table), since)
+                    await conn.execute(
+                        f"INSERT INTO {table} {derived_select(table, _NEW_FACTS)}", since
+                    )
+            await _set_watermark(conn, watermark if watermark is not None else since)
+            for table in DERIVED_TABLES:
+                await conn.execute(f"ANALYZE {table}")
+    await query_cache.invalidate()
+
+
+async def check_rollups(pool: Pool) -> bool:
+    """Actualiza ``queries.derived_ready`` sin tocar el esquema.
+
+    Las tablas sirven si todas tienen la versión actual y ya se llenaron
+    (hay marca de agua); si no, las consultas leen de los hechos.
+    """
+    async with pool.acquire() as conn:
+        missing = await _missing(conn)
+        filled = not missing and await conn.fetchval(
+            f"SELECT EXISTS (SELECT 1 FROM {WATERMARK_TABLE} WHERE name = $1)", _WATERMARK
+        )
+    global _checked
+    ready = bool(filled)
+    if ready != queries.derived_ready or not _checked:
+        if ready:
+            print("✅ Tablas resumen al día")
+        else:
+            print(
+                f"⚠️ Tablas resumen sin migrar o sin llenar ({', '.join(missing) or 'sin marca de agua'}); "
+                "se consulta gold.fact_sales"
+            )
+    queries.derived_ready = ready
+    _checked = True
+    return ready
+
+
+@contextlib.asynccontextmanager
+async def rollup_lifespan():
+    """Tarea de lifespan: comprueba periódicamente las tablas derivadas.
+
+    No crea ni modifica nada (eso es la CLI). Cuando una migración o un
+    refresco las deja al día, la siguiente comprobación las empieza a usar.
+    """
+
+    async def check_loop():
+        while True:
+            try:
+                await check_rollups(await get_pool())
+            except Exception as e:
+                queries.derived_ready = False
+                print(f"❌ Error comprobando tablas resumen: {e}")
+            await asyncio.sleep(CHECK_INTERVAL)
+
+    task = asyncio.create_task(check_loop()) if os.getenv("DATABASE_URL") else None
+    try:
+        yield
+    finally:
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+async def _main(incremental: bool):
+    try:
+        pool = await get_pool()
+        await migrate_rollups(pool)
+        await refresh_rollups(pool, incremental=incremental)
+        print("✅ Tablas resumen actualizadas")
+    finally:
+        await close_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresca las tablas derivadas de gold.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="sólo re-agrega los hechos desde la última marca de agua",
+    )
+    asyncio.run(_main(parser.parse_args().incremental))
@@ -0,0 +1,93 @@
+"""Índice invertido de n-gramas para la búsqueda de la tabla en memoria.
+
+Los campos de texto se repiten mucho (ciudades, estados, categorías), así
+que el índice tiene dos niveles: cada valor distinto en minúsculas guarda
+las filas donde aparece, y cada n-grama guarda los valores que lo
+contienen. Una búsqueda de ``n`` o más caracteres intersecta las listas de
+sus n-gramas y verifica los valores candidatos con ``in``; una más corta
+recorre los valores distintos, que son muchos menos que filas × campos.
+El resultado es el mismo que recorrer todas las filas con
+``search in campo.lower()``.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+_EMPTY = np.zeros(0, dtype=np.int32)
+
+
+class NGramIndex:
+    """Postings ``n-grama -> valores -> ids de fila`` (arrays de int32)."""
+
+    def __init__(self, value_rows: dict[str, np.ndarray], size: int, n: int = 3):
+        self.n = n
+        self.size = size
+        self._values = list(value_rows)
+        self._value_rows = list(value_rows.values())
+
+        postings: dict[str, list[int]] = {}
+        for value_id, value in enumerate(self._values):
+            for gram in {value[i:i + n] for i in range(len(value) - n + 1)}:
+                postings.setdefault(gram, []).append(value_id)
+        self._postings = {
+            gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()
+        }
+
+    @classmethod
+    def from_columns(
+        cls, columns: Sequence[tuple[np.ndarray, Sequence[str]]], size: int, n: int = 3
+    ) -> "NGramIndex":
+        """Índice sobre columnas ya codificadas como (códigos, valores).
+
+        Las filas de cada valor salen de agrupar los códigos con un argsort,
+        sin recorrer las filas en Python.
+        """
+        parts: dict[str, list[np.ndarray]] = {}
+        for codes, values in columns:
+            order = np.argsort(codes, kind="stable").astype(np.int32)
+            counts = np.bincount(codes, minlength=len(values))
+            for value, ids in zip(values, np.split(order, np.cumsum(counts)[:-1])):
+                if len(ids):
+                    parts.setdefault(value.lower(), []).append(ids)
+        value_rows = {
+            value: ids[0] if len(ids) == 1 else np.unique(np.concatenate(ids))
+            for value, ids in parts.items()
+        }
+        return cls(value_rows, size, n)
+
+    def _matching_values(self, query: str) -> np.ndarray:
+        if len(query) < self.n:
+            return np.asarray(
+                [i for i, value in enumerate(self._values) if query in value],
+                dtype=np.int32,
+            )
+        if len(query) == self.n:
+            return self._postings.get(query, _EMPTY)
+
+        grams = {query[i:i + self.n] for i in range(len(query) - self.n + 1)}
+        lists = [self._postings.get(gram) for gram in grams]
+        if any(ids is None for ids in lists):
+            return _EMPTY
+
+        lists.sort(key=len)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                return _EMPTY
+        return np.asarray(
+            [i for i in candidates if query in self._values[i]], dtype=np.int32
+        )
+
+    def search(self, query: str) -> np.ndarray:
+        """Ids (ordenados) de las filas con ``query`` en alguno de sus campos."""
+        query = query.lower()
+        if not query:
+            return np.arange(self.size, dtype=np.int32)
+        values = self._matching_values(query)
+        if not len(values):
+            return _EMPTY
+        selected = np.zeros(self.size, dtype=bool)
+        selected[np.concatenate([self._value_rows[i] for i in values])] = True
+        return np.flatnonzero(selected).astype(np.int32)
@@ -0,0 +1,59 @@
+"""Single-flight: una sola ejecución por clave entre todas las sesiones.
+
+Cuando muchas sesiones piden la misma consulta a la vez (tras un deploy o
+cuando vence la caché), la primera la ejecuta y las demás esperan ese
+mismo resultado en lugar de abrir cada una su conexión a Neon.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes con la misma clave."""
+
+    def __init__(self):
+        self.executed = 0
+        self.shared = 0
+        self._calls: dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Devuelve el resultado de ``fn()``, compartido con quien ya lo esté
+        esperando para ``key``.
+
+        La ejecución corre en su propia tarea: si un llamador se cancela, los
+        demás siguen esperando; si se cancelan todos, se cancela también la
+        consulta.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.executed += 1
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "executed": self.executed, "shared": self.shared}
@@ -0,0 +1,51 @@
+"""Permutaciones de orden precalculadas para la tabla en memoria.
+
+Al cargar los items se calcula, una sola vez por columna ordenable, el
+argsort estable de sus valores (en minúsculas para los textos, como el
+orden original). Ordenar un subconjunto filtrado es entonces combinar la
+permutación con la máscara del filtro, e invertir el orden es una vista
+``[::-1]`` del resultado.
+"""
+
+from typing import Any, Sequence
+
+import numpy as np
+
+
+class SortIndex:
+    """Permutación (y su rango inverso) por columna."""
+
+    def __init__(self, columns: dict[str, Sequence[Any]]):
+        self.size = len(next(iter(columns.values()), ()))
+        self._perms: dict[str, np.ndarray] = {}
+        self._ranks: dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            if len(values) and isinstance(values[0], str):
+                keys = np.asarray([v.lower() for v in values])
+            else:
+                keys = np.asarray(values)
+            perm = np.argsort(keys, kind="stable").astype(np.int32)
+            ranks = np.empty_like(perm)
+            ranks[perm] = np.arange(len(perm), dtype=np.int32)
+            self._perms[name] = perm
+            self._ranks[name] = ranks
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._perms
+
+    def order(self, column: str, ids: np.ndarray, reverse: bool = False) -> np.ndarray:
+        """Ids de ``ids`` ordenados por ``column``.
+
+        Para subconjuntos chicos se ordena por rango (O(k log k)); si no se
+        recorre la permutación completa con la máscara (O(n)).
+        """
+        perm = self._perms[column]
+        if len(ids) == self.size:
+            ordered = perm
+        elif len(ids) * 8 < self.size:
+            ordered = ids[np.argsort(self._ranks[column][ids], kind="stable")]
+        else:
+            selected = np.zeros(self.size, dtype=bool)
+            selected[ids] = True
+            ordered = perm[selected[perm]]
+        return ordered[::-1] if reverse else ordered
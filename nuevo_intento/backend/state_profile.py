@@ -0,0 +1,214 @@
+"""Perfil del tamaño del estado que Reflex envía y guarda por sesión.
+
+Después de cada evento se mide el tamaño serializado (JSON, como viaja al
+navegador) de cada var que cambió en el delta, y el de cada var de backend
+de los estados cargados (pickle, como Reflex guarda la sesión en Redis
+aunque nunca viaje al navegador), y se anota qué handler la hizo crecer.
+Las vars que superan ``STATE_VAR_BUDGET`` bytes, las sesiones cuya suma
+de vars supera ``STATE_SESSION_BUDGET`` y las que guardan más de
+``STATE_BACKEND_BUDGET`` bytes en vars de backend se marcan con un aviso
+(una vez por var y handler, o por sesión).
+
+Se activa en desarrollo con ``STATE_PROFILE=1`` (``StateProfileMiddleware``)
+y lo usa ``benchmarks/handlers.py --profile`` para fallar si algún loader o
+página de la tabla se pasa del presupuesto.
+"""
+
+import os
+import pickle
+from collections import OrderedDict
+
+import reflex as rx
+from reflex.middleware import Middleware
+from reflex.utils import format
+
+from .metrics import _handler_label
+
+ENABLED = os.getenv("STATE_PROFILE", "0").lower() in ("1", "true", "yes")
+
+# Bytes máximos de una var serializada.
+VAR_BUDGET = int(os.getenv("STATE_VAR_BUDGET", str(64 * 1024)))
+
+# Bytes máximos de la suma de vars de una sesión.
+SESSION_BUDGET = int(os.getenv("STATE_SESSION_BUDGET", str(512 * 1024)))
+
+# Bytes máximos de la suma de vars de backend de una sesión (pickle).
+BACKEND_BUDGET = int(os.getenv("STATE_BACKEND_BUDGET", str(64 * 1024)))
+
+# Sesiones cuyo tamaño se sigue; las más viejas se olvidan.
+MAX_SESSIONS = 1000
+
+_VAR_SUFFIX = "_rx_state_"
+
+
+def _state_label(full_name: str) -> str:
+    try:
+        return rx.State.get_class_substate(full_name).__name__
+    except Exception:
+        return full_name.rpartition(".")[2]
+
+
+def var_sizes(delta: dict) -> dict[str, int]:
+    """Bytes de cada var del delta, como ``Estado.var``."""
+    sizes = {}
+    for state_name, fields in delta.items():
+        label = _state_label(state_name)
+        for field, value in fields.items():
+            name = field.removesuffix(_VAR_SUFFIX)
+            sizes[f"{label}.{name}"] = len(format.json_dumps(value).encode())
+    return sizes
+
+
+def backend_var_sizes(state: rx.State) -> dict[str, int]:
+    """Bytes (pickle) de cada var de backend de ``state`` y sus subestados cargados."""
+    sizes = {}
+    label = type(state).__name__
+    inherited = state.inherited_backend_vars
+    # ``backend_vars`` tiene los nombres y defaults de la clase; los valores
+    # de la sesión están en ``_backend_vars``.
+    for name in state.backend_vars:
+        if name in inherited:
+            continue
+        value = state._backend_vars.get(name)
+        try:
+            sizes[f"{label}.{name}"] = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            # Reflex recurre a dill con lo que pickle no serializa; no se mide.
+            continue
+    for substate in state.substates.values():
+        sizes.update(backend_var_sizes(substate))
+    return sizes
+
+
+class VarProfile:
+    def __init__(self):
+        self.events = 0
+        self.last_bytes = 0
+        self.max_bytes = 0
+        self.max_handler = ""
+        # handler -> crecimiento acumulado (bytes)
+        self.growth: dict[str, int] = {}
+        self.over_budget = 0
+
+
+class StateProfiler:
+    """Acumula tamaños por var y por sesión."""
+
+    def __init__(
+        self,
+        var_budget: int = VAR_BUDGET,
+        session_budget: int = SESSION_BUDGET,
+        backend_budget: int = BACKEND_BUDGET,
+    ):
+        self.var_budget = var_budget
+        self.session_budget = session_budget
+        self.backend_budget = backend_budget
+        self.vars: dict[str, VarProfile] = {}
+        # Nombres de las vars de backend vistas (cuentan aparte).
+        self._backend: set[str] = set()
+        self._sessions: OrderedDict[str, dict[str, int]] = OrderedDict()
+        self._warned: set[tuple[str, str]] = set()
+        self.violations: list[str] = []
+
+    def observe(
+        self, token: str, handler: str, delta: dict, backend: dict[str, int] | None = None
+    ) -> dict[str, int]:
+        """Registra el delta que ``handler`` envió a la sesión ``token``.
+
+        ``backend`` son los tamaños de ``backend_var_sizes`` tras el evento;
+        en lugar de los presupuestos por var y por sesión, su suma se compara
+        con ``backend_budget``.
+        """
+        sizes = var_sizes(delta)
+        if backend:
+            self._backend.update(backend)
+            sizes.update(backend)
+        session = self._sessions.setdefault(token, {})
+        self._sessions.move_to_end(token)
+        while len(self._sessions) > MAX_SESSIONS:
+            self._sessions.popitem(last=False)
+
+        for var, size in sizes.items():
+            profile = self.vars.setdefault(var, VarProfile())
+            growth = size - session.get(var, 0)
+            session[var] = size
+            profile.events += 1
+            profile.last_bytes = size
+            if growth > 0:
+                profile.growth[handler] = profile.growth.get(handler, 0) + growth
+            if size > profile.max_bytes:
+                profile.max_bytes, profile.max_handler = size, handler
+            if size > self.var_budget and var not in self._backend:
+                profile.over_budget += 1
+                self._warn(
+                    (var, handler),
+                    f"{var} ocupa {size:,} bytes tras {handler} (presupuesto {self.var_budget:,})",
+                )
+
+        stored = sum(size for var, size in session.items() if var in self._backend)
+        total = sum(session.values()) - stored
+        if total > self.session_budget:
+            self._warn(
+                (token, ""),
+                f"la sesión {token[:8]} suma {total:,} bytes de estado tras {handler} "
+                f"(presupuesto {self.session_budget:,})",
+            )
+        if stored > self.backend_budget:
+            self._warn(
+                (token, "backend"),
+                f"la sesión {token[:8]} guarda {stored:,} bytes en vars de backend tras "
+                f"{handler} (presupuesto {self.backend_budget:,})",
+            )
+        return sizes
+
+    def _warn(self, key: tuple[str, str], message: str):
+        if key in self._warned:
+            return
+        self._warned.add(key)
+        self.violations.append(message)
+        print(f"⚠️ Estado: {message}")
+
+    def report(self) -> list[dict]:
+        """Vars de mayor a menor tamaño máximo, con el handler que más las hizo crecer."""
+        rows = []
+        for var, profile in self.vars.items():
+            top = max(profile.growth.items(), key=lambda item: item[1], default=("", 0))
+            rows.append({
+                "var": var,
+                "max_bytes": profile.max_bytes,
+                "max_handler": profile.max_handler,
+                "last_bytes": profile.last_bytes,
+                "top_growth_handler": top[0],
+                "growth_bytes": top[1],
+                "events": profile.events,
+                "over_budget": profile.over_budget,
+            })
+        rows.sort(key=lambda row: row["max_bytes"], reverse=True)
+        return rows
+
+
+profiler = StateProfiler()
+
+
+def print_report(rows: list[dict], limit: int = 15):
+    print(f"{'var':<40} {'máx B':>9} {'handler':<36} {'> presup.':>9}")
+    for row in rows[:limit]:
+        print(
+            f"{row['var']:<40} {row['max_bytes']:>9,} {row['max_handler']:<36} "
+            f"{row['over_budget']:>9}"
+        )
+
+
+class StateProfileMiddleware(Middleware):
+    """Pasa cada delta enviado al navegador, y las vars de backend, por el ``profiler``."""
+
+    async def preprocess(self, app, state, event):
+        return None
+
+    async def postprocess(self, app, state, event, update):
+        # Las vars de backend cambian sin aparecer en el delta, así que se
+        # miden después de cada evento.
+        profiler.observe(
+            event.token, _handler_label(event.name), update.delta or {}, backend_var_sizes(state)
+        )
+        return update
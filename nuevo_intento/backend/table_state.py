@@ -1,12 +1,21 @@
+import asyncio
+import itertools
+import json
 import os
-from typing import List
+import time
+from collections import OrderedDict
+from typing import Any, List
+import numpy as np
 import reflex as rx
-import asyncpg
 from asyncpg import Pool
-from dotenv import load_dotenv
 from pydantic import BaseModel
 
-load_dotenv()
+from . import queries
+from .columns import ColumnStore
+from .db import acquire, get_pool
+from .queries import SEARCH_COUNT_CAP, SORT_COLUMNS
+from .search_index import NGramIndex
+from .sort_index import SortIndex
 
 
 class SalesItem(BaseModel):
@@ -31,6 +40,201 @@ class SalesItem(BaseModel):
     month_name: str
 
 
+# Filas que carga el modo snapshot (se guardan por columna en el proceso,
+# al cliente sólo viaja la página visible).
+SNAPSHOT_LIMIT = int(os.getenv("TABLE_SNAPSHOT_LIMIT", "5000"))
+
+# Filas por lote al leer el snapshot con el cursor del servidor.
+SNAPSHOT_BATCH = int(os.getenv("TABLE_SNAPSHOT_BATCH", "1000"))
+
+# Segundos que se reutiliza un snapshot antes de volver a leerlo.
+SNAPSHOT_TTL = float(os.getenv("TABLE_SNAPSHOT_TTL", "300"))
+
+# Modo de la tabla, fijo por proceso (no es una var del estado, así que el
+# cliente no lo puede cambiar). En modo servidor cada página se pide a Neon
+# con una consulta keyset y ``items`` sólo guarda la página actual; en modo
+# snapshot se carga un bloque fijo de filas (``Snapshot``) que se pagina,
+# ordena y filtra en memoria, y sólo la página visible se convierte en
+# SalesItem.
+SERVER_SIDE = os.getenv("TABLE_SERVER_SIDE", "1").lower() in ("1", "true", "yes")
+
+# Carga del snapshot en curso por sesión, para cancelarla si se recarga.
+_snapshot_tasks: dict[str, asyncio.Task] = {}
+
+# Espera (s) desde la última tecla antes de buscar en la base.
+SEARCH_DEBOUNCE = float(os.getenv("TABLE_SEARCH_DEBOUNCE", "0.3"))
+
+# Búsqueda en curso por sesión, para cancelarla cuando llega otra tecla.
+_search_tasks: dict[str, asyncio.Task] = {}
+
+# Los campos de queries.SEARCH_COLUMNS, como atributos de SalesItem, para
+# la búsqueda en memoria.
+_SEARCH_FIELDS = (
+    "order_id",
+    "customer_city",
+    "customer_state",
+    "seller_city",
+    "seller_state",
+    "product_category_name",
+    "status",
+    "status_group",
+    "month_name",
+)
+
+
+# Columnas con permutación de orden precalculada (las del select de la tabla).
+_SORTABLE_FIELDS = tuple(SORT_COLUMNS)
+
+
+def _row_to_item(row) -> SalesItem:
+    """Convierte una fila de asyncpg en un SalesItem."""
+    return SalesItem(
+        order_id=str(row['order_id'] or 'N/A'),
+        order_item_id=int(row['order_item_id'] or 0),
+        price=float(row['price'] or 0.0),
+        freight_value=float(row['freight_value'] or 0.0),
+        total=float(row['total'] or 0.0),
+        customer_city=str(row['customer_city'] or 'N/A'),
+        customer_state=str(row['customer_state'] or 'N/A'),
+        seller_city=str(row['seller_city'] or 'N/A'),
+        seller_state=str(row['seller_state'] or 'N/A'),
+        product_category_name=str(row['product_category_name'] or 'Sin categoría'),
+        product_weight_g=int(row['product_weight_g'] or 0),
+        status=str(row['status'] or 'N/A'),
+        status_group=str(row['status_group'] or 'N/A'),
+        purchase_date=str(row['purchase_date'] or 'N/A'),
+        year=int(row['year'] or 0),
+        month=int(row['month'] or 0),
+        month_name=str(row['month_name'] or 'N/A')
+    )
+
+
+class Snapshot:
+    """Filas del snapshot por columna y sus índices.
+
+    La consulta es la misma para todas las sesiones, así que el proceso
+    guarda una sola copia y cada sesión sólo recuerda su ``version``. Una
+    versión publicada no se modifica: recargar publica otra.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        rows: ColumnStore,
+        search_index: NGramIndex | None = None,
+        sort_index: SortIndex | None = None,
+    ):
+        self.version = version
+        self.rows = rows
+        self.search_index = search_index
+        self.sort_index = sort_index
+        self.loaded_at = time.monotonic()
+
+
+# Versiones publicadas, de la más vieja a la más nueva. Se conservan unas
+# pocas para que una sesión que todavía usa la anterior no quede vacía.
+_snapshots: OrderedDict[int, Snapshot] = OrderedDict()
+_MAX_SNAPSHOTS = 4
+_snapshot_versions = itertools.count(1)
+
+# Lectura del snapshot en curso (un _SnapshotLoad).
+_snapshot_load = None
+
+# Posiciones filtradas y ordenadas por (versión, búsqueda, orden, sentido),
+# compartidas entre sesiones; paginar sólo corta el resultado.
+_pipelines: OrderedDict[tuple, np.ndarray] = OrderedDict()
+_MAX_PIPELINES = 64
+
+
+def build_indexes(rows: ColumnStore) -> tuple[NGramIndex, SortIndex]:
+    """Índice de búsqueda y permutaciones de orden de ``rows``."""
+    search_index = NGramIndex.from_columns(
+        [(rows.column(field), rows.values(field)) for field in _SEARCH_FIELDS],
+        len(rows),
+    )
+    sort_index = SortIndex({field: rows.sort_keys(field) for field in _SORTABLE_FIELDS})
+    return search_index, sort_index
+
+
+def publish_snapshot(
+    rows: ColumnStore, indexes: tuple[NGramIndex, SortIndex] | None = None
+) -> Snapshot:
+    """Registra ``rows`` como la versión más nueva del snapshot."""
+    snapshot = Snapshot(next(_snapshot_versions), rows, *(indexes or ()))
+    _snapshots[snapshot.version] = snapshot
+    while len(_snapshots) > _MAX_SNAPSHOTS:
+        _snapshots.popitem(last=False)
+    return snapshot
+
+
+def _fresh_snapshot() -> Snapshot | None:
+    """La última versión completa, si tiene menos de SNAPSHOT_TTL segundos."""
+    for snapshot in reversed(_snapshots.values()):
+        if snapshot.search_index is not None:
+            if time.monotonic() - snapshot.loaded_at < SNAPSHOT_TTL:
+                return snapshot
+            return None
+    return None
+
+
+async def _read_snapshot(first: asyncio.Future) -> Snapshot:
+    """Lee el snapshot por lotes con un cursor del servidor y lo publica.
+
+    Si el snapshot ocupa más de un lote, el primero se publica apenas llega
+    (sin índices) y resuelve ``first``, así la primera página no espera al
+    resto de la lectura. El snapshot completo se publica una vez, al final.
+    """
+    rows = ColumnStore(SalesItem)
+    try:
+        pool = await get_pool()
+        async with acquire(pool) as conn:
+            print("🔍 Conectando a Neon y cargando datos...")
+            # Los cursores del servidor sólo viven dentro de una transacción
+            async with conn.transaction(readonly=True):
+                cursor = await conn.cursor(
+                    queries.SNAPSHOT.sql, *queries.SNAPSHOT.bind((SNAPSHOT_LIMIT,))
+                )
+                while batch := await cursor.fetch(SNAPSHOT_BATCH):
+                    items = [_row_to_item(row) for row in batch]
+                    rows.append(items)
+                    if not first.done() and len(batch) == SNAPSHOT_BATCH:
+                        partial = ColumnStore(SalesItem)
+                        partial.append(items)
+                        first.set_result(publish_snapshot(partial))
+    finally:
+        if not first.done():
+            first.set_result(None)
+    # Los índices se arman una vez por versión y fuera del event loop.
+    snapshot = publish_snapshot(rows, await asyncio.to_thread(build_indexes, rows))
+    print(f"✅ Cargados {len(rows)} registros desde Neon")
+    return snapshot
+
+
+class _SnapshotLoad:
+    """Lectura del snapshot compartida por las sesiones que la esperan.
+
+    ``first`` se resuelve con el primer lote publicado, o con ``None`` si
+    no hay uno parcial; ``task`` termina con el snapshot completo.
+    """
+
+    def __init__(self):
+        self.first: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.task = asyncio.create_task(_read_snapshot(self.first))
+
+
+def _shared_snapshot_load() -> _SnapshotLoad:
+    """La lectura en curso, o una nueva si no hay ninguna."""
+    global _snapshot_load
+    if _snapshot_load is None or _snapshot_load.task.done():
+        _snapshot_load = _SnapshotLoad()
+    return _snapshot_load
+
+
+def _escape_like(value: str) -> str:
+    """Escapa los comodines de LIKE en un texto de búsqueda."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 class TableState(rx.State):
     """Estado de la tabla con conexión a Neon PostgreSQL."""
 
@@ -43,202 +247,373 @@ class TableState(rx.State):
     offset: int = 0
     limit: int = 12
 
-    _db_pool: Pool = None
+    # El total filtrado es una estimación del planner (búsquedas muy amplias).
+    search_estimated: bool = False
+
+    # Total filtrado y claves (orden, order_id, order_item_id) de la primera
+    # y la última fila de la página actual, usadas como cursor del keyset.
+    _server_total: int = 0
+    _first_key: tuple = ()
+    _last_key: tuple = ()
+    # Versión del Snapshot del proceso que ve la sesión (0: ninguna).
+    _snapshot_version: int = 0
     error_message: str = ""
 
     async def get_db_pool(self) -> Pool:
-        """Obtiene o crea el pool de conexiones a Neon."""
-        if self._db_pool is None:
-            database_url = os.getenv("DATABASE_URL")
-            if not database_url:
-                raise ValueError("DATABASE_URL no está configurada en el archivo .env")
-            
-            self._db_pool = await asyncpg.create_pool(
-                database_url,
-                min_size=1,
-                max_size=10,
-                command_timeout=60
-            )
-        return self._db_pool
+        """Obtiene el pool de conexiones a Neon compartido por el proceso."""
+        return await get_pool()
 
     @rx.event
     async def load_entries(self):
         """Carga ventas con datos enriquecidos desde Neon."""
+        if SERVER_SIDE:
+            await self._load_server_page("first")
+        elif (snapshot := _fresh_snapshot()) is not None:
+            self._use_snapshot(snapshot)
+        else:
+            return TableState.stream_snapshot
+
+    @rx.event(background=True)
+    async def stream_snapshot(self):
+        """Espera la lectura compartida del snapshot y la publica en la sesión.
+
+        Todas las sesiones que cargan a la vez esperan la misma lectura; si
+        una se cancela (otra recarga de la misma sesión), la lectura sigue
+        para las demás. La sesión muestra el primer lote apenas se publica y
+        pasa al snapshot completo al final; el estado se toma sin tener una
+        conexión del pool.
+        """
+        token = self.router.session.client_token
+        previous = _snapshot_tasks.get(token)
+        if previous is not None:
+            previous.cancel()
+        task = asyncio.current_task()
+        _snapshot_tasks[token] = task
+
         try:
-            pool = await self.get_db_pool()
-            
-            async with pool.acquire() as conn:
-                print("🔍 Conectando a Neon y cargando datos...")
-                
-                # Reducido a 50 registros para evitar problemas de serialización
-                query = """
-                    SELECT 
-                        f.order_id,
-                        f.order_item_id,
-                        f.price,
-                        f.freight_value,
-                        f.total,
-                        c.customer_city,
-                        c.customer_state,
-                        s.seller_city,
-                        s.seller_state,
-                        p.product_category_name,
-                        p.product_weight_g,
-                        st.status,
-                        st.status_group,
-                        cal.date_ymd as purchase_date,
-                        cal.date_year as year,
-                        cal.date_month as month,
-                        cal.month_name
-                    FROM gold.fact_sales f
-                    LEFT JOIN gold.dim_customers c ON f.customer_key = c.customer_key
-                    LEFT JOIN gold.dim_sellers s ON f.seller_key = s.seller_key
-                    LEFT JOIN gold.dim_products p ON f.product_key = p.product_key
-                    LEFT JOIN gold.dim_status st ON f.status_key = st.status_key
-                    LEFT JOIN gold.dim_calendar cal ON f.date_purchase_key = cal.date_key
-                    ORDER BY cal.date_ymd DESC
-                    LIMIT 20
-                """
-                
-                rows = await conn.fetch(query)
-                print(f"📊 Query ejecutada, {len(rows)} filas obtenidas")
-                
-                # Limpiar items existentes primero
-                self.items = []
-                
-                # Crear lista temporal
-                new_items = []
-                for row in rows:
-                    item = SalesItem(
-                        order_id=str(row['order_id'] or 'N/A'),
-                        order_item_id=int(row['order_item_id'] or 0),
-                        price=float(row['price'] or 0.0),
-                        freight_value=float(row['freight_value'] or 0.0),
-                        total=float(row['total'] or 0.0),
-                        customer_city=str(row['customer_city'] or 'N/A'),
-                        customer_state=str(row['customer_state'] or 'N/A'),
-                        seller_city=str(row['seller_city'] or 'N/A'),
-                        seller_state=str(row['seller_state'] or 'N/A'),
-                        product_category_name=str(row['product_category_name'] or 'Sin categoría'),
-                        product_weight_g=int(row['product_weight_g'] or 0),
-                        status=str(row['status'] or 'N/A'),
-                        status_group=str(row['status_group'] or 'N/A'),
-                        purchase_date=str(row['purchase_date'] or 'N/A'),
-                        year=int(row['year'] or 0),
-                        month=int(row['month'] or 0),
-                        month_name=str(row['month_name'] or 'N/A')
-                    )
-                    new_items.append(item)
-                
-                # Asignar de una vez
-                self.items = new_items
-                self.total_items = len(self.items)
+            load = _shared_snapshot_load()
+            partial = await asyncio.shield(load.first)
+            if partial is not None:
+                async with self:
+                    self._use_snapshot(partial)
+            snapshot = await asyncio.shield(load.task)
+            async with self:
+                self._use_snapshot(snapshot)
                 self.error_message = ""
-                print(f"✅ Cargados {self.total_items} registros desde Neon")
-                
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
             error_msg = str(e)
             print(f"❌ Error cargando datos: {error_msg}")
-            self.error_message = error_msg
-            self.items = []
-            self.total_items = 0
+            async with self:
+                self.error_message = error_msg
+                self._use_snapshot(None)
+        finally:
+            if _snapshot_tasks.get(token) is task:
+                del _snapshot_tasks[token]
+
+    def _use_snapshot(self, snapshot: Snapshot | None):
+        """Apunta la sesión a una versión del snapshot del proceso."""
+        self.items = []
+        self._snapshot_version = snapshot.version if snapshot is not None else 0
+        self.total_items = len(snapshot.rows) if snapshot is not None else 0
+
+    def _snapshot(self) -> Snapshot | None:
+        """El Snapshot de la sesión.
+
+        Si el proceso ya no tiene esa versión (se descartó o el backend se
+        reinició) se usa la más nueva, sin guardarla en el estado.
+        """
+        if not self._snapshot_version:
+            return None
+        snapshot = _snapshots.get(self._snapshot_version)
+        if snapshot is None and _snapshots:
+            snapshot = next(reversed(_snapshots.values()))
+        return snapshot
+
+    def _sort_spec(self) -> tuple[str, bool]:
+        """Columna del orden actual (clave de SORT_COLUMNS) y si es descendente."""
+        if self.sort_value in SORT_COLUMNS:
+            return self.sort_value, self.sort_reverse
+        # Sin columna elegida se mantiene el orden por fecha más reciente.
+        return "purchase_date", not self.sort_reverse
+
+    def _search_pattern(self) -> str | None:
+        """Patrón LIKE sobre el texto indexado de ``gold.fact_sales_search``.
+
+        La tabla guarda en minúsculas los mismos campos que revisa
+        _get_filtered_ids, con un índice pg_trgm, así que el LIKE '%texto%'
+        se resuelve por índice con la misma semántica de subcadena que la
+        búsqueda en memoria.
+        """
+        if not self.search_value:
+            return None
+        return f"%{_escape_like(self.search_value.lower())}%"
+
+    async def _fetch_page(
+        self,
+        conn,
+        key: tuple = (),
+        backwards: bool = False,
+        limit: int | None = None,
+    ) -> list:
+        """Pide una página con seek sobre (orden, order_id, order_item_id).
+
+        Con ``key`` vacío se lee desde el principio (o desde el final si
+        ``backwards``); si no, se continúa a partir de esa clave. Las filas
+        siempre se devuelven en el orden de la tabla.
+        """
+        sort, descending = self._sort_spec()
+        if backwards:
+            descending = not descending
+        rows = await queries.sales_page(
+            conn, sort, descending, limit or self.limit, self._search_pattern(), key
+        )
+        return list(reversed(rows)) if backwards else list(rows)
+
+    async def _count(self, conn) -> tuple[int, bool]:
+        """Total de filas que cumplen la búsqueda y si es una estimación.
+
+        Con búsqueda se cuenta exacto hasta SEARCH_COUNT_CAP filas; por
+        encima se usa la estimación del planner.
+        """
+        pattern = self._search_pattern()
+        if pattern is None:
+            return await queries.fact_count(conn), False
+
+        capped = await queries.search_count(conn, pattern)
+        if capped <= SEARCH_COUNT_CAP:
+            return capped, False
+
+        plan = await queries.search_estimate(conn, pattern)
+        estimate = int(json.loads(plan)[0]["Plan"]["Plan Rows"])
+        return max(estimate, SEARCH_COUNT_CAP + 1), True
+
+    def _set_page(self, rows: list):
+        """Materializa la página actual y guarda sus claves de keyset."""
+        self.items = [_row_to_item(row) for row in rows]
+        if rows:
+            first, last = rows[0], rows[-1]
+            self._first_key = (first["sort_key"], first["order_id"], first["order_item_id"])
+            self._last_key = (last["sort_key"], last["order_id"], last["order_item_id"])
+        else:
+            self._first_key = ()
+            self._last_key = ()
+
+    async def _query_server_page(self, conn, action: str) -> dict:
+        """Consulta una navegación en modo servidor sin modificar el estado.
+
+        ``action`` es "first", "next", "prev" o "last". "first" también
+        recalcula los totales, ya que se usa tras cambiar búsqueda u orden.
+        Devuelve los valores que luego aplica _apply_server_page.
+        """
+        page: dict[str, Any] = {}
+        if action == "first":
+            page["total"], page["estimated"] = await self._count(conn)
+            page["rows"] = await self._fetch_page(conn)
+            page["offset"] = 0
+        elif action == "next":
+            page["rows"] = await self._fetch_page(conn, key=self._last_key)
+            page["offset"] = self.offset + self.limit
+        elif action == "prev":
+            page["rows"] = await self._fetch_page(conn, key=self._first_key, backwards=True)
+            page["offset"] = max(0, self.offset - self.limit)
+        else:
+            page["offset"] = (self.total_pages - 1) * self.limit
+            # Con un total estimado no se sabe cuántas filas tiene la última página.
+            remaining = self._server_total - page["offset"]
+            page["rows"] = await self._fetch_page(
+                conn,
+                backwards=True,
+                limit=self.limit if self.search_estimated else remaining,
+            )
+        return page
+
+    def _apply_server_page(self, page: dict):
+        if "total" in page:
+            self._server_total = page["total"]
+            self.search_estimated = page["estimated"]
+            if not self.search_value:
+                self.total_items = page["total"]
+        elif not page["rows"]:
+            # La estimación era mayor que el total real: esta es la última página.
+            self._server_total = self.offset + len(self.items)
+            self.search_estimated = False
+            return
+        self._set_page(page["rows"])
+        self.offset = page["offset"]
+        self.error_message = ""
+
+    def _server_page_error(self, e: Exception):
+        error_msg = str(e)
+        print(f"❌ Error cargando página: {error_msg}")
+        self.error_message = error_msg
+        self._set_page([])
+        self._server_total = 0
+        self.search_estimated = False
+        self.offset = 0
+
+    async def _load_server_page(self, action: str):
+        """Ejecuta una navegación en modo servidor."""
+        try:
+            pool = await self.get_db_pool()
+            async with acquire(pool) as conn:
+                page = await self._query_server_page(conn, action)
+            self._apply_server_page(page)
+        except Exception as e:
+            self._server_page_error(e)
 
     @rx.event
-    def set_search_value(self, value: str):
+    async def set_search_value(self, value: str):
         self.search_value = value
         self.offset = 0
+        if SERVER_SIDE:
+            return TableState.search_server
+
+    @rx.event(background=True)
+    async def search_server(self):
+        """Búsqueda en modo servidor con debounce.
+
+        Cada tecla lanza esta tarea y la nueva cancela a la anterior de la
+        misma sesión, tanto si está esperando el debounce como si su consulta
+        sigue en curso (asyncpg cancela la consulta en el servidor). La
+        consulta corre fuera del lock del estado para que la siguiente tecla
+        no tenga que esperarla.
+        """
+        token = self.router.session.client_token
+        previous = _search_tasks.get(token)
+        if previous is not None:
+            previous.cancel()
+        task = asyncio.current_task()
+        _search_tasks[token] = task
+        try:
+            await asyncio.sleep(SEARCH_DEBOUNCE)
+            search_value = self.search_value
+            try:
+                pool = await self.get_db_pool()
+                async with acquire(pool) as conn:
+                    page = await self._query_server_page(conn, "first")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                async with self:
+                    self._server_page_error(e)
+                return
+            async with self:
+                if self.search_value == search_value:
+                    self._apply_server_page(page)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if _search_tasks.get(token) is task:
+                del _search_tasks[token]
 
     @rx.event
-    def set_sort_value(self, value: str):
+    async def set_sort_value(self, value: str):
         self.sort_value = value
         self.offset = 0
+        if SERVER_SIDE:
+            await self._load_server_page("first")
 
     @rx.event
-    def toggle_sort(self):
+    async def toggle_sort(self):
         self.sort_reverse = not self.sort_reverse
+        if SERVER_SIDE:
+            await self._load_server_page("first")
 
     @rx.event  
-    def prev_page(self):
+    async def prev_page(self):
         if self.page_number > 1:
-            self.offset = max(0, self.offset - self.limit)
+            if SERVER_SIDE:
+                await self._load_server_page("prev")
+            else:
+                self.offset = max(0, self.offset - self.limit)
 
     @rx.event
-    def next_page(self):
+    async def next_page(self):
         if self.page_number < self.total_pages:
-            self.offset = min(
-                (self.total_pages - 1) * self.limit,
-                self.offset + self.limit
-            )
+            if SERVER_SIDE:
+                await self._load_server_page("next")
+            else:
+                self.offset = min(
+                    (self.total_pages - 1) * self.limit,
+                    self.offset + self.limit
+                )
 
     @rx.event
-    def first_page(self):
-        self.offset = 0
+    async def first_page(self):
+        if SERVER_SIDE:
+            await self._load_server_page("first")
+        else:
+            self.offset = 0
 
     @rx.event
-    def last_page(self):
+    async def last_page(self):
         if self.total_pages > 1:
-            self.offset = (self.total_pages - 1) * self.limit
+            if SERVER_SIDE:
+                await self._load_server_page("last")
+            else:
+                self.offset = (self.total_pages - 1) * self.limit
 
-    def _get_filtered_items(self) -> List[SalesItem]:
-        """Método auxiliar para filtrar items."""
+    def _get_filtered_ids(self, snapshot: Snapshot) -> np.ndarray:
+        """Posiciones en el snapshot de las filas que pasan la búsqueda."""
+        if snapshot.search_index is not None:
+            return snapshot.search_index.search(self.search_value)
         if not self.search_value:
-            return self.items
-        
-        search_value = self.search_value.lower()
-        filtered = []
-        
-        for item in self.items:
-            if (search_value in item.order_id.lower() or
-                search_value in item.customer_city.lower() or
-                search_value in item.customer_state.lower() or
-                search_value in item.seller_city.lower() or
-                search_value in item.seller_state.lower() or
-                search_value in item.product_category_name.lower() or
-                search_value in item.status.lower() or
-                search_value in item.status_group.lower() or
-                search_value in item.month_name.lower()):
-                filtered.append(item)
-        
-        return filtered
-
-    def _get_sorted_items(self, items: List[SalesItem]) -> List[SalesItem]:
-        """Método auxiliar para ordenar items."""
+            return np.arange(len(snapshot.rows), dtype=np.int32)
+        return snapshot.rows.search(self.search_value, _SEARCH_FIELDS)
+
+    def _get_sorted_ids(self, snapshot: Snapshot, ids: np.ndarray) -> np.ndarray:
+        """Ordena posiciones con la permutación precalculada.
+
+        Una columna sin permutación se ordena en el momento por sus claves.
+        """
         if not self.sort_value:
-            return items
-        
-        numeric_fields = ["price", "freight_value", "total", "product_weight_g", "year", "month"]
-        
-        if self.sort_value in numeric_fields:
-            return sorted(
-                items,
-                key=lambda x: getattr(x, self.sort_value),
-                reverse=self.sort_reverse
-            )
+            return ids
+        index = snapshot.sort_index
+        if index is not None and self.sort_value in index:
+            return index.order(self.sort_value, ids, self.sort_reverse)
+        keys = snapshot.rows.sort_keys(self.sort_value)[ids]
+        ordered = ids[np.argsort(keys, kind="stable")]
+        return ordered[::-1] if self.sort_reverse else ordered
+
+    def _get_pipeline_ids(self, snapshot: Snapshot) -> np.ndarray:
+        """Filtro y orden memoizados por proceso: paginar sólo corta el resultado."""
+        key = (snapshot.version, self.search_value, self.sort_value, self.sort_reverse)
+        ids = _pipelines.get(key)
+        if ids is None:
+            ids = self._get_sorted_ids(snapshot, self._get_filtered_ids(snapshot))
+            _pipelines[key] = ids
+            while len(_pipelines) > _MAX_PIPELINES:
+                _pipelines.popitem(last=False)
         else:
-            return sorted(
-                items,
-                key=lambda x: getattr(x, self.sort_value).lower(),
-                reverse=self.sort_reverse
-            )
+            _pipelines.move_to_end(key)
+        return ids
 
     @rx.var
     def get_current_page(self) -> List[SalesItem]:
         """Obtiene la página actual de items."""
-        # Filtrar
-        filtered = self._get_filtered_items()
-        
-        # Ordenar
-        sorted_items = self._get_sorted_items(filtered)
-        
-        # Paginar
-        start = self.offset
-        end = start + self.limit
-        return sorted_items[start:end]
+        # En modo servidor items ya es la página pedida a Neon
+        if SERVER_SIDE:
+            return self.items
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return []
+
+        # Filtrar y ordenar con los índices precalculados, y materializar
+        # sólo las filas de la página
+        ids = self._get_pipeline_ids(snapshot)
+        return snapshot.rows.items(ids[self.offset:self.offset + self.limit])
 
     @rx.var
     def filtered_total(self) -> int:
         """Total de items filtrados."""
-        return len(self._get_filtered_items())
+        if SERVER_SIDE:
+            return self._server_total
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return 0
+        return len(self._get_pipeline_ids(snapshot))
 
     @rx.var
     def page_number(self) -> int:
@@ -250,5 +625,3 @@ class TableState(rx.State):
         if total == 0:
             return 1
         return (total + self.limit - 1) // self.limit
-    
-    
\ No newline at end of file
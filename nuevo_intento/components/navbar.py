@@ -118,7 +118,7 @@ def menu_button() -> rx.Component:
         page_dict
         for page_list in DECORATED_PAGES.values()
         for _, page_dict in page_list
-        if page_dict["route"] != "/about"
+        if page_dict["route"] not in ("/about", "/queries")
     ]
 
     ordered_pages = sorted(
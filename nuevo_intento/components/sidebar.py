@@ -144,7 +144,7 @@ def sidebar() -> rx.Component:
         page_dict
         for page_list in DECORATED_PAGES.values()
         for _, page_dict in page_list
-        if page_dict["route"] != "/about"
+        if page_dict["route"] not in ("/about", "/queries")
     ]
 
     ordered_pages = sorted(
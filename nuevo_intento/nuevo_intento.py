@@ -4,10 +4,34 @@
 import reflex as rx
 
 from . import styles
+from .backend import metrics, state_profile
+from .backend.db import pool_lifespan
+from .backend.engine import engine_lifespan
+from .backend.rollups import rollup_lifespan
+from .backend.table_state import TableState
 from .pages import *
+from .templates.template import ThemeState
+from .views.charts import StatsState
 
 # Create the app.
 app = rx.App(
     style=styles.base_style,
     stylesheets=styles.base_stylesheets,
+    # GET /metrics en formato Prometheus (METRICS_ENABLED=1).
+    api_transformer=metrics.metrics_api() if metrics.ENABLED else None,
 )
+
+if metrics.ENABLED:
+    metrics.instrument_states(StatsState, TableState, ThemeState)
+    app.add_middleware(metrics.MetricsMiddleware())
+
+# Tamaño por var del estado y presupuestos, para desarrollo (STATE_PROFILE=1).
+if state_profile.ENABLED:
+    app.add_middleware(state_profile.StateProfileMiddleware())
+
+# Un único pool de conexiones por proceso, abierto y cerrado con la app.
+app.register_lifespan_task(pool_lifespan)
+# Tablas resumen que alimentan los gráficos temporales y de ranking.
+app.register_lifespan_task(rollup_lifespan)
+# Motor analítico en memoria (opcional, ANALYTICS_ENGINE=1).
+app.register_lifespan_task(engine_lifespan)
@@ -1,7 +1,8 @@
 from .index import index
+from .queries import queries
 from .settings import settings
 from .table import table
 from .vendedores import vendedores
 from .ventas_temporal import ventas_temporal
 
-__all__ = ["index", "settings", "table", "vendedores", "ventas_temporal"]
+__all__ = ["index", "queries", "settings", "table", "vendedores", "ventas_temporal"]
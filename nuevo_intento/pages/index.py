@@ -28,7 +28,7 @@ def tab_content_header() -> rx.Component:
     )
 
 
-@template(route="/", title="Dashboard", on_load=[StatsState.load_line_chart, StatsState.load_pie_chart, StatsState.load_kpi_data],)
+@template(route="/", title="Dashboard", on_load=[StatsState.load_line_chart, StatsState.load_pie_chart, StatsState.load_kpi_data], concurrent_on_load=True,)
 def index() -> rx.Component:
     """The overview page.
 
@@ -0,0 +1,25 @@
+"""Página de diagnóstico con las consultas más costosas.
+
+Sólo se registra con ``QUERY_REPORT_ENABLED=1``: muestra SQL y planes.
+"""
+
+import reflex as rx
+
+from ..backend import querylog
+from ..templates import template
+from ..views.query_report import QueryReportState, query_report
+
+
+def queries() -> rx.Component:
+    return rx.vstack(
+        rx.heading("Top consultas", size="5"),
+        query_report(),
+        spacing="6",
+        width="100%",
+    )
+
+
+if querylog.REPORT_ENABLED:
+    queries = template(route="/queries", title="Consultas", on_load=QueryReportState.load_report)(
+        queries
+    )
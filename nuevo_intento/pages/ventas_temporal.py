@@ -19,7 +19,8 @@ from ..components.card import card
         StatsState.load_sales_by_year, 
         StatsState.load_sales_by_month,
         StatsState.load_temporal_chart
-    ]
+    ],
+    concurrent_on_load=True,
 )
 def ventas_temporal() -> rx.Component:
     return rx.vstack(
@@ -7,6 +7,7 @@ from typing import Callable
 import reflex as rx
 
 from .. import styles
+from ..backend.loaders import gather_loaders
 from ..components.navbar import navbar
 from ..components.sidebar import sidebar
 
@@ -72,6 +73,7 @@ def template(
     meta: str | None = None,
     script_tags: list[rx.Component] | None = None,
     on_load: rx.event.EventType[()] | None = None,
+    concurrent_on_load: bool = False,
 ) -> Callable[[Callable[[], rx.Component]], rx.Component]:
     """The template for each page of the app.
 
@@ -81,6 +83,8 @@ def template(
         description: The description of the page.
         meta: Additional meta to add to the page.
         on_load: The event handler(s) called when the page load.
+        concurrent_on_load: Run the on_load handlers of each state concurrently
+            in a single event (states must use ConcurrentLoadMixin).
         script_tags: Scripts to attach to the page.
 
     Returns:
@@ -101,6 +105,10 @@ def template(
         # Get the meta tags for the page.
         all_meta = [*default_meta, *(meta or [])]
 
+        page_on_load = (
+            gather_loaders(on_load) if concurrent_on_load and on_load else on_load
+        )
+
         def templated_page():
             return rx.flex(
                 navbar(),
@@ -141,7 +149,7 @@ def template(
             description=description,
             meta=all_meta,
             script_tags=script_tags,
-            on_load=on_load,
+            on_load=page_on_load,
         )
         def theme_wrap():
             return rx.theme(
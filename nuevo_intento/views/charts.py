@@ -1,18 +1,18 @@
 import datetime
 import random
-import os
 from asyncpg import Pool
-import asyncpg
 import reflex as rx
-from dotenv import load_dotenv
 from reflex.components.radix.themes.base import (
     LiteralAccentColor,
 )
+from ..backend import queries
+from ..backend.db import get_pool
+from ..backend.engine import engine
+from ..backend.kpi import fetch_kpis
+from ..backend.loaders import ConcurrentLoadMixin
 from ..components.card import card
 
-_db_pool = None
-
-class StatsState(rx.State):
+class StatsState(ConcurrentLoadMixin, rx.State):
     area_toggle: bool = True
     selected_tab: str = "estado"
     device_data:list[dict] = []
@@ -36,11 +36,7 @@ class StatsState(rx.State):
 
 
     async def get_db_pool(self) -> Pool:
-        global _db_pool
-        if _db_pool is None:
-            database_url = os.getenv("DATABASE_URL")
-            _db_pool = await asyncpg.create_pool(database_url)
-        return _db_pool
+        return await get_pool()
 
     @rx.event
     def set_selected_tab(self, tab: str | list[str]):
@@ -49,72 +45,56 @@ class StatsState(rx.State):
     @rx.event
     def set_start_date(self, date: str):
         self.start_date = date
-        return [StatsState.load_line_chart, StatsState.load_temporal_chart]
+        return StatsState.reload_loaders(["load_line_chart"])
 
     @rx.event
     def set_end_date(self, date: str):
         self.end_date = date
-        return [StatsState.load_line_chart, StatsState.load_temporal_chart]
+        return StatsState.reload_loaders(["load_line_chart"])
 
     @rx.event
     def set_month_chart_year(self, value: str):
         self.month_chart_year = value
-        return StatsState.load_sales_by_month
+        return StatsState.reload_loaders(["load_sales_by_month"])
 
     @rx.event
     def set_month_chart_month(self, value: str):
         self.month_chart_month = value
-        return StatsState.load_sales_by_month
+        return StatsState.reload_loaders(["load_sales_by_month"])
 
     @rx.event
     def set_daily_chart_year(self, value: str):
         self.daily_chart_year = value
-        return StatsState.load_temporal_chart
+        return StatsState.reload_loaders(["load_temporal_chart"])
 
     @rx.event
     def set_daily_chart_month(self, value: str):
         self.daily_chart_month = value
-        return StatsState.load_temporal_chart
+        return StatsState.reload_loaders(["load_temporal_chart"])
 
     @rx.event
     def set_daily_chart_day(self, value: str):
         self.daily_chart_day = value
-        return StatsState.load_temporal_chart
+        return StatsState.reload_loaders(["load_temporal_chart"])
 
     @rx.event
     def set_seller_chart_year(self, value: str):
         self.seller_chart_year = value
-        return StatsState.load_sales_by_seller
+        return StatsState.reload_loaders(["load_sales_by_seller"])
 
     def toggle_areachart(self):
         self.area_toggle = not self.area_toggle
 
-    @rx.event
-    async def load_line_chart(self):
-        pool = await self.get_db_pool()
-
-        group_map = {
-            "estado": "c.customer_state",
-            "ciudad": "c.customer_city",
-            "categoria": "p.product_category_name",
+    def _chart_filter(self, year: str, month: str = "All", day: str = "All") -> dict:
+        """Selectores "All"/valor convertidos a filtros del motor analítico
+        y de backend/queries.py."""
+        return {
+            name: int(value)
+            for name, value in (("year", year), ("month", month), ("day", day))
+            if value != "All"
         }
 
-        group_field = group_map[self.selected_tab]
-
-        query = f"""
-            SELECT
-                {group_field} AS label,
-                SUM(f.total) AS ventas
-            FROM gold.fact_sales f
-            JOIN gold.dim_calendar cal ON f.date_purchase_key = cal.date_key
-            JOIN gold.dim_customers c ON f.customer_key = c.customer_key
-            JOIN gold.dim_products p ON f.product_key = p.product_key
-            WHERE cal.date_ymd >= $1 AND cal.date_ymd <= $2
-            GROUP BY label
-            ORDER BY ventas DESC
-            LIMIT 10
-        """
-
+    async def _load_line_chart(self) -> dict:
         try:
             start = datetime.date.fromisoformat(self.start_date)
             end = datetime.date.fromisoformat(self.end_date)
@@ -122,189 +102,142 @@ class StatsState(rx.State):
             start = datetime.date(2018, 8, 28)
             end = datetime.date(2018, 9, 3)
 
-        async with pool.acquire() as conn:
-            rows = await conn.fetch(query, start, end)
+        if engine.ready:
+            engine_columns = {
+                "estado": "customer_state",
+                "ciudad": "customer_city",
+                "categoria": "product_category_name",
+            }
+            rows = engine.top_n(
+                engine_columns[self.selected_tab], 10, start=start, end=end
+            )
+        else:
+            rows = await queries.line_chart(
+                await self.get_db_pool(), self.selected_tab, start, end
+            )
 
-        self.line_data = [
+        return {"line_data": [
             {
                 "Ventas": float(r["ventas"]),
                 "Label": r["label"],
             }
             for r in rows
-        ]
+        ]}
 
     @rx.event
-    async def load_temporal_chart(self):
-        pool = await self.get_db_pool()
+    async def load_line_chart(self):
+        self._apply_updates(await self._load_line_chart())
 
-        conditions = []
-        args = []
+    async def _load_temporal_chart(self) -> dict:
+        filters = self._chart_filter(
+            self.daily_chart_year, self.daily_chart_month, self.daily_chart_day
+        )
+        if engine.ready:
+            rows = engine.sales_by_day(**filters)
+        else:
+            rows = await queries.sales_by_day(await self.get_db_pool(), **filters)
 
-        if self.daily_chart_year != "All":
-            args.append(int(self.daily_chart_year))
-            conditions.append(f"cal.date_year = ${len(args)}")
-        
-        if self.daily_chart_month != "All":
-            args.append(int(self.daily_chart_month))
-            conditions.append(f"cal.date_month = ${len(args)}")
-
-        if self.daily_chart_day != "All":
-            args.append(int(self.daily_chart_day))
-            conditions.append(f"cal.date_day = ${len(args)}")
-
-        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
-
-        query = f"""
-            SELECT
-                cal.date_ymd AS date,
-                SUM(f.total) AS ventas
-            FROM gold.fact_sales f
-            JOIN gold.dim_calendar cal ON f.date_purchase_key = cal.date_key
-            {where_clause}
-            GROUP BY cal.date_ymd
-            ORDER BY cal.date_ymd;
-        """
-
-        async with pool.acquire() as conn:
-            if args:
-                rows = await conn.fetch(query, *args)
-            else:
-                rows = await conn.fetch(query)
-
-        self.temporal_data = [
+        return {"temporal_data": [
             {"date": str(r["date"]), "ventas": float(r["ventas"])}
             for r in rows
-        ]
+        ]}
 
     @rx.event
-    async def load_pie_chart(self):
-        pool = await self.get_db_pool()
-
-        query = f"""
-            SELECT
-                cal.date_year AS label,
-                SUM(f.total) AS ventas
-            FROM gold.fact_sales f
-            JOIN gold.dim_calendar cal ON f.date_purchase_key = cal.date_key
-            GROUP BY label
-            ORDER BY label;
-        """
+    async def load_temporal_chart(self):
+        self._apply_updates(await self._load_temporal_chart())
 
-        async with pool.acquire() as conn:
-            rows = await conn.fetch(query)
+    async def _load_pie_chart(self) -> dict:
+        if engine.ready:
+            rows = engine.sales_by_year()
+        else:
+            rows = await queries.sales_by_year(await self.get_db_pool())
 
         colors = ["#0088FE", "#00C49F", "#FFBB28", "#FF8042", "#8884d8", "#82ca9d"]
 
-        self.device_data = [
+        return {"device_data": [
             {
-                "name": str(r["label"]),
+                "name": str(r["date_year"]),
                 "value": round(float(r["ventas"]), 2),
                 "fill": colors[i % len(colors)],
             }
             for i, r in enumerate(rows)
-        ]
-
+        ]}
 
     @rx.event
-    async def load_sales_by_year(self):
-        pool = await self.get_db_pool()
-        query = """
-            SELECT
-                cal.date_year,
-                SUM(f.total) AS ventas
-            FROM gold.fact_sales f
-            JOIN gold.dim_calendar cal ON f.date_purchase_key = cal.date_key
-            GROUP BY cal.date_year
-            ORDER BY cal.date_year;
-        """
-        async with pool.acquire() as conn:
-            rows = await conn.fetch(query)
-        
-        self.sales_by_year_data = [
+    async def load_pie_chart(self):
+        self._apply_updates(await self._load_pie_chart())
+
+    async def _load_sales_by_year(self) -> dict:
+        if engine.ready:
+            rows = engine.sales_by_year()
+        else:
+            rows = await queries.sales_by_year(await self.get_db_pool())
+
+        return {"sales_by_year_data": [
             {"name": str(r["date_year"]), "ventas": float(r["ventas"])}
             for r in rows
-        ]
+        ]}
 
     @rx.event
-    async def load_sales_by_month(self):
-        pool = await self.get_db_pool()
-        
-        conditions = []
-        args = []
-
-        if self.month_chart_year != "All":
-            args.append(int(self.month_chart_year))
-            conditions.append(f"cal.date_year = ${len(args)}")
-        
-        if self.month_chart_month != "All":
-            args.append(int(self.month_chart_month))
-            conditions.append(f"cal.date_month = ${len(args)}")
-
-        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
-
-        query = f"""
-            SELECT
-                cal.date_year,
-                cal.date_month,
-                SUM(f.total) AS ventas
-            FROM gold.fact_sales f
-            JOIN gold.dim_calendar cal ON f.date_purchase_key = cal.date_key
-            {where_clause}
-            GROUP BY cal.date_year, cal.date_month
-            ORDER BY cal.date_year, cal.date_month;
-        """
-        async with pool.acquire() as conn:
-            rows = await conn.fetch(query, *args) if args else await conn.fetch(query)
+    async def load_sales_by_year(self):
+        self._apply_updates(await self._load_sales_by_year())
+
+    async def _load_sales_by_month(self) -> dict:
+        filters = self._chart_filter(self.month_chart_year, self.month_chart_month)
+        if engine.ready:
+            rows = engine.sales_by_month(**filters)
+        else:
+            rows = await queries.sales_by_month(await self.get_db_pool(), **filters)
         
         # Formato YYYY-MM para el eje X
-        self.sales_by_month_data = [
+        return {"sales_by_month_data": [
             {
                 "name": f"{r['date_year']}-{str(r['date_month']).zfill(2)}", 
                 "ventas": float(r["ventas"])
             }
             for r in rows
-        ]
+        ]}
 
     @rx.event
-    async def load_kpi_data(self):
-        pool = await self.get_db_pool()
-        async with pool.acquire() as conn:
-            self.kpi_customers = await conn.fetchval("SELECT COUNT(*) FROM gold.dim_customers") or 0
-            self.kpi_sales = float(await conn.fetchval("SELECT SUM(total) FROM gold.fact_sales") or 0.0)
-            self.kpi_orders = await conn.fetchval("SELECT COUNT(DISTINCT order_id) FROM gold.fact_sales") or 0
+    async def load_sales_by_month(self):
+        self._apply_updates(await self._load_sales_by_month())
+
+    async def _load_kpi_data(self) -> dict:
+        if engine.ready:
+            return {
+                "kpi_customers": engine.customers,
+                "kpi_sales": engine.total_sales(),
+                "kpi_orders": engine.distinct_orders(),
+            }
+        kpis = await fetch_kpis(await self.get_db_pool())
+        return {
+            "kpi_customers": kpis["customers"],
+            "kpi_sales": kpis["sales"],
+            "kpi_orders": kpis["orders"],
+        }
 
     @rx.event
-    async def load_sales_by_seller(self):
-        pool = await self.get_db_pool()
-        
-        conditions = []
-        args = []
-
-        if self.seller_chart_year != "All":
-            args.append(int(self.seller_chart_year))
-            conditions.append(f"cal.date_year = ${len(args)}")
-
-        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
-
-        query = f"""
-            SELECT
-                s.seller_id,
-                SUM(f.total) AS ventas
-            FROM gold.fact_sales f
-            JOIN gold.dim_sellers s ON f.seller_key = s.seller_key
-            JOIN gold.dim_calendar cal ON f.date_purchase_key = cal.date_key
-            {where_clause}
-            GROUP BY s.seller_id
-            ORDER BY ventas DESC
-            LIMIT 10;
-        """
-        async with pool.acquire() as conn:
-            rows = await conn.fetch(query, *args) if args else await conn.fetch(query)
+    async def load_kpi_data(self):
+        self._apply_updates(await self._load_kpi_data())
+
+    async def _load_sales_by_seller(self) -> dict:
+        filters = self._chart_filter(self.seller_chart_year)
+        if engine.ready:
+            rows = [
+                {"seller_id": r["label"], "ventas": r["ventas"]}
+                for r in engine.top_n("seller_id", 10, **filters)
+            ]
+        else:
+            rows = await queries.top_sellers(await self.get_db_pool(), **filters)
         
-        self.seller_data = [
+        return {"seller_data": [
             {"name": str(r["seller_id"]), "ventas": float(r["ventas"])}
             for r in rows
-        ]
+        ]}
+
+    @rx.event
+    async def load_sales_by_seller(self):
+        self._apply_updates(await self._load_sales_by_seller())
 
 
 
@@ -0,0 +1,109 @@
+"""Reporte de consultas más costosas (ver backend/querylog.py)."""
+
+import reflex as rx
+
+from ..backend import querylog
+
+_ORDERS = {
+    "Tiempo total": "total_ms",
+    "Media": "mean_ms",
+    "Máximo": "max_ms",
+    "Llamadas": "calls",
+    "Lentas": "slow_calls",
+}
+
+
+class QueryReportState(rx.State):
+    """Top de huellas de consultas del proceso que atiende la sesión."""
+
+    queries: list[dict] = []
+    order_label: str = "Tiempo total"
+    enabled: bool = querylog.ENABLED
+    slow_query_ms: float = querylog.SLOW_QUERY_MS
+
+    @rx.event
+    def load_report(self):
+        # Los eventos se pueden disparar aunque la página no esté registrada.
+        if not querylog.REPORT_ENABLED:
+            return
+        self.queries = querylog.top_queries(order=_ORDERS[self.order_label])
+
+    @rx.event
+    def set_order(self, value: str):
+        self.order_label = value
+        self.load_report()
+
+
+def _query_row(query: dict) -> rx.Component:
+    return rx.table.row(
+        rx.table.cell(rx.code(query["queryid"])),
+        rx.table.cell(
+            rx.vstack(
+                rx.text(query["query"], size="1", font_family="monospace"),
+                rx.cond(
+                    query["plan"],
+                    rx.el.details(
+                        rx.el.summary("Plan (EXPLAIN ANALYZE)"),
+                        rx.code_block(query["plan"].to(str), language="sql"),
+                    ),
+                ),
+                max_width="60em",
+            )
+        ),
+        rx.table.cell(query["calls"]),
+        rx.table.cell(query["total_ms"]),
+        rx.table.cell(query["mean_ms"]),
+        rx.table.cell(query["stddev_ms"]),
+        rx.table.cell(query["max_ms"]),
+        rx.table.cell(query["rows"]),
+        rx.table.cell(query["slow_calls"]),
+        align="center",
+    )
+
+
+def query_report() -> rx.Component:
+    return rx.vstack(
+        rx.cond(
+            ~QueryReportState.enabled,
+            rx.callout(
+                "El registro de consultas está desactivado (QUERY_LOG_ENABLED=1 para activarlo).",
+                icon="info",
+                color_scheme="gray",
+            ),
+        ),
+        rx.hstack(
+            rx.text(f"Lentas: más de {QueryReportState.slow_query_ms} ms"),
+            rx.spacer(),
+            rx.select(
+                list(_ORDERS),
+                value=QueryReportState.order_label,
+                on_change=QueryReportState.set_order,
+            ),
+            rx.icon_button(
+                rx.icon("refresh-cw", size=18),
+                on_click=QueryReportState.load_report,
+                variant="soft",
+            ),
+            align="center",
+            width="100%",
+        ),
+        rx.table.root(
+            rx.table.header(
+                rx.table.row(
+                    *[
+                        rx.table.column_header_cell(name)
+                        for name in (
+                            "queryid", "Consulta", "Llamadas", "Total ms", "Media ms",
+                            "Desvío ms", "Máx ms", "Filas", "Lentas",
+                        )
+                    ]
+                ),
+            ),
+            rx.table.body(rx.foreach(QueryReportState.queries, _query_row)),
+            variant="surface",
+            size="2",
+            width="100%",
+        ),
+        spacing="4",
+        width="100%",
+    )
@@ -52,7 +52,11 @@ def _pagination_view() -> rx.Component:
             rx.text(
                 "Page ",
                 rx.code(TableState.page_number),
-                f" of {TableState.total_pages}",
+                rx.cond(
+                    TableState.search_estimated,
+                    f" of ~{TableState.total_pages}",
+                    f" of {TableState.total_pages}",
+                ),
                 justify="end",
             ),
             rx.hstack(
@@ -0,0 +1,112 @@
+"""Pruebas de la caché de consultas (backend/cache.py) sobre un Redis falso."""
+
+import asyncio
+import datetime
+import decimal
+import fnmatch
+import pickle
+import time
+
+from nuevo_intento.backend.cache import QueryCache, make_key
+from nuevo_intento.backend.cache_backends import MemoryBackend, RedisBackend
+
+
+class FakeRedis:
+    """Lo que usa RedisBackend de ``redis.asyncio.Redis``, en memoria."""
+
+    def __init__(self):
+        self.data: dict[str, tuple[float, bytes]] = {}
+
+    def _alive(self, key: str) -> bool:
+        entry = self.data.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self.data[key]
+        return key in self.data
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data[key][1] if self._alive(key) else None
+
+    async def set(self, key: str, data: bytes, px: int):
+        self.data[key] = (time.monotonic() + px / 1000, data)
+
+    async def scan_iter(self, match: str, count: int = 10):
+        for key in list(self.data):
+            if self._alive(key) and fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+ROWS = [
+    {"date": datetime.date(2018, 1, 2), "ventas": decimal.Decimal("10.50"), "items": 3},
+    {"date": datetime.date(2018, 1, 3), "ventas": None, "items": 0},
+]
+
+
+def _cache(**kwargs) -> QueryCache:
+    return QueryCache(backend=RedisBackend(FakeRedis()), **kwargs)
+
+
+def test_round_trip_keeps_types():
+    async def run():
+        # compress_min_size=1 fuerza también el camino con zlib.
+        for cache in (_cache(), _cache(compress_min_size=1)):
+            key = make_key("SELECT 1", (datetime.date(2018, 1, 1),))
+            await cache.set(key, ROWS)
+            assert await cache.get(key) == (True, ROWS)
+            assert cache.hits == 1 and cache.misses == 0
+
+    asyncio.run(run())
+
+
+def test_expired_entries_are_misses():
+    async def run():
+        for cache in (_cache(ttl=0.05), QueryCache(backend=MemoryBackend(), ttl=0.05)):
+            key = make_key("SELECT 1", ())
+            await cache.set(key, 1)
+            assert await cache.get(key) == (True, 1)
+            await asyncio.sleep(0.1)
+            assert await cache.get(key) == (False, None)
+
+    asyncio.run(run())
+
+
+def test_invalidate_by_pattern_and_namespace():
+    async def run():
+        cache = _cache()
+        other = QueryCache(backend=cache.backend, namespace="otro")
+        day = make_key("SELECT * FROM gold.rollup_sales_day", ())
+        seller = make_key("SELECT * FROM gold.rollup_sales_day_seller", ())
+        for key in (day, seller):
+            await cache.set(key, 1)
+            await other.set(key, 1)
+
+        assert await cache.invalidate("rollup_sales_day_seller") == 1
+        assert (await cache.get(seller))[0] is False
+        assert (await cache.get(day))[0] is True
+
+        assert await cache.invalidate() == 1
+        assert (await cache.get(day))[0] is False
+        assert (await other.get(day))[0] is True
+
+    asyncio.run(run())
+
+
+class _Boom:
+    def __reduce__(self):
+        return (exec, ("raise SystemExit('pickle ejecutado')",))
+
+
+def test_unreadable_entries_are_misses():
+    async def run():
+        cache = _cache()
+        key = make_key("SELECT 1", ())
+        storage_key = cache.storage_key(key)
+        # Un pickle (como los que guardaba la versión anterior) nunca se carga.
+        for data in (b"\x00" + pickle.dumps(_Boom()), b"\x03no es zlib", b"\x02{roto"):
+            await cache.backend.set(storage_key, data, 60)
+            assert await cache.get(key) == (False, None)
+        assert cache.hits == 0 and cache.misses == 3 and cache.errors == 3
+
+    asyncio.run(run())
@@ -0,0 +1,74 @@
+"""Selección de variantes por filtros de fecha (backend/queries.py)."""
+
+import datetime
+
+from nuevo_intento.backend.queries import (
+    SALES_BY_DAY,
+    SALES_BY_MONTH,
+    TOP_SELLERS,
+    _pick,
+    date_range,
+)
+
+
+def test_no_filters():
+    assert date_range(None, None, None) is None
+    assert _pick(SALES_BY_DAY, None, None, None) == (SALES_BY_DAY[(False, False, False)], ())
+    assert _pick(SALES_BY_MONTH, None, None) == (SALES_BY_MONTH[(False, False)], ())
+    assert _pick(TOP_SELLERS, None) == (TOP_SELLERS[(False,)], ())
+    assert "WHERE" not in SALES_BY_DAY[(False, False, False)].sql
+
+
+def test_only_year():
+    bounds = (datetime.date(2017, 1, 1), datetime.date(2018, 1, 1))
+    assert date_range(2017) == bounds
+    assert _pick(SALES_BY_DAY, 2017, None, None) == (SALES_BY_DAY["range"], bounds)
+    assert _pick(TOP_SELLERS, 2017) == (TOP_SELLERS["range"], bounds)
+
+
+def test_year_and_month():
+    bounds = (datetime.date(2018, 2, 1), datetime.date(2018, 3, 1))
+    assert date_range(2018, 2) == bounds
+    assert _pick(SALES_BY_MONTH, 2018, 2) == (SALES_BY_MONTH["range"], bounds)
+
+    day = (datetime.date(2018, 2, 28), datetime.date(2018, 3, 1))
+    assert date_range(2018, 2, 28) == day
+    assert _pick(SALES_BY_DAY, 2018, 2, 28) == (SALES_BY_DAY["range"], day)
+
+
+def test_december_rolls_over_to_next_year():
+    bounds = (datetime.date(2017, 12, 1), datetime.date(2018, 1, 1))
+    assert date_range(2017, 12) == bounds
+    assert _pick(SALES_BY_DAY, 2017, 12, None) == (SALES_BY_DAY["range"], bounds)
+
+    last_day = (datetime.date(2017, 12, 31), datetime.date(2018, 1, 1))
+    assert date_range(2017, 12, 31) == last_day
+
+
+def test_month_without_year_uses_equality():
+    # "agosto de todos los años" no es un tramo contiguo.
+    assert date_range(None, 8) is None
+    statement, args = _pick(SALES_BY_DAY, None, 8, None)
+    assert statement is SALES_BY_DAY[(False, True, False)] and args == (8,)
+    assert "date_month = $1::int" in statement.sql
+    assert _pick(SALES_BY_MONTH, None, 8) == (SALES_BY_MONTH[(False, True)], (8,))
+
+    # Un día de todos los meses, o de un año sin mes, tampoco.
+    assert date_range(2018, None, 3) is None
+    assert _pick(SALES_BY_DAY, 2018, None, 3) == (SALES_BY_DAY[(True, False, True)], (2018, 3))
+
+
+def test_impossible_date_uses_equality():
+    assert date_range(2018, 2, 30) is None
+    assert _pick(SALES_BY_DAY, 2018, 2, 30) == (SALES_BY_DAY[(True, True, True)], (2018, 2, 30))
+
+
+def test_picked_arguments_bind():
+    for variants, values in (
+        (SALES_BY_DAY, (2017, 12, None)),
+        (SALES_BY_DAY, (None, 8, 3)),
+        (SALES_BY_MONTH, (2018, None)),
+        (TOP_SELLERS, (None,)),
+    ):
+        statement, args = _pick(variants, *values)
+        assert statement.bind(args) == args
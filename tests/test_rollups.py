@@ -0,0 +1,96 @@
+"""Refresco incremental de las tablas derivadas (backend/rollups.py).
+
+Necesita una base Postgres local y descartable en ``TEST_DATABASE_URL``:
+la prueba recrea en ella las tablas gold con datos sintéticos. Sin esa
+variable se omite.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from benchmarks.synthetic import generate, is_local
+from nuevo_intento.backend.db import close_pools, get_pool
+from nuevo_intento.backend.queries import DERIVED_TABLES
+from nuevo_intento.backend.rollups import get_watermark, migrate_rollups, refresh_rollups
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL or not is_local(DATABASE_URL),
+    reason="requiere TEST_DATABASE_URL con una base local",
+)
+
+
+async def _contents(conn) -> dict[str, list[tuple]]:
+    """Filas de cada tabla derivada, ordenadas y con los floats redondeados."""
+    contents = {}
+    for table in DERIVED_TABLES:
+        rows = await conn.fetch(f"SELECT * FROM {table}")
+        contents[table] = sorted(
+            (tuple(round(v, 6) if isinstance(v, float) else v for v in row.values()) for row in rows),
+            key=repr,
+        )
+    return contents
+
+
+def test_incremental_refresh_matches_full_rebuild():
+    async def run():
+        await generate(DATABASE_URL, 20_000, replace=True, chunk=20_000, seed=7)
+        pool = await get_pool(DATABASE_URL)
+        try:
+            async with pool.acquire() as conn:
+                # El ETL todavía no cargó el último 10% de los días.
+                cutoff = await conn.fetchval(
+                    "SELECT percentile_disc(0.9) WITHIN GROUP (ORDER BY date_purchase_key) "
+                    "FROM gold.fact_sales"
+                )
+                await conn.execute("DROP TABLE IF EXISTS pg_temp.pending")
+                await conn.execute(
+                    "CREATE TEMP TABLE pending AS "
+                    "SELECT * FROM gold.fact_sales WHERE date_purchase_key > $1",
+                    cutoff,
+                )
+                await conn.execute("DELETE FROM gold.fact_sales WHERE date_purchase_key > $1", cutoff)
+
+                await migrate_rollups(pool)
+                await refresh_rollups(pool)
+                watermark = await get_watermark(conn)
+                assert watermark == cutoff
+
+                # Llegan los hechos nuevos, uno tardío del día de la marca y
+                # uno sin fecha.
+                await conn.execute("INSERT INTO gold.fact_sales SELECT * FROM pending")
+                await conn.execute(
+                    """
+                    INSERT INTO gold.fact_sales
+                    SELECT 'tardio-' || order_id, order_item_id, price, freight_value, total,
+                           customer_key, seller_key, product_key, status_key, date_purchase_key
+                    FROM gold.fact_sales WHERE date_purchase_key = $1 LIMIT 3
+                    """,
+                    watermark,
+                )
+                await conn.execute(
+                    """
+                    INSERT INTO gold.fact_sales
+                    SELECT 'sin-fecha-' || order_id, order_item_id, price, freight_value, total,
+                           customer_key, seller_key, product_key, status_key, NULL
+                    FROM gold.fact_sales LIMIT 2
+                    """
+                )
+
+                await refresh_rollups(pool, incremental=True)
+                assert await get_watermark(conn) > watermark
+                incremental = await _contents(conn)
+
+                await refresh_rollups(pool)
+                full = await _contents(conn)
+
+            for table in DERIVED_TABLES:
+                assert incremental[table], table
+                assert incremental[table] == full[table], table
+        finally:
+            await close_pools()
+
+    asyncio.run(run())
@@ -0,0 +1,52 @@
+"""NGramIndex (backend/search_index.py) contra el filtro fila por fila."""
+
+import random
+
+import numpy as np
+
+from nuevo_intento.backend.columns import encode
+from nuevo_intento.backend.search_index import NGramIndex
+
+FIELDS = {
+    "customer_city": ["São Paulo", "são josé dos campos", "Rio de Janeiro", "Brasília", "Niterói"],
+    "customer_state": ["SP", "RJ", "DF", "SC"],
+    "product_category_name": ["beleza_saude", "cama_mesa_banho", "utilidades_domesticas", "Eletrônicos"],
+}
+
+QUERIES = [
+    "", "s", "ã", "o", "SP", "sp", "ão", "jo", "í", "são", "SÃO", "paulo",
+    "são paulo", "ão p", "rio de", "a_s", "_", "eletrô", "brasília", "zz",
+    "niteroi", "campos", "ê",
+]
+
+
+def _rows(size: int) -> dict[str, list[str]]:
+    rng = random.Random(7)
+    return {field: [rng.choice(values) for _ in range(size)] for field, values in FIELDS.items()}
+
+
+def _naive(rows: dict[str, list[str]], query: str) -> np.ndarray:
+    """El filtro original: ``search in str(campo).lower()`` en cada fila."""
+    search = query.lower()
+    size = len(next(iter(rows.values())))
+    return np.asarray(
+        [i for i in range(size) if any(search in str(rows[f][i]).lower() for f in rows)],
+        dtype=np.int32,
+    )
+
+
+def test_lookups_match_naive_filter():
+    rows = _rows(500)
+    index = NGramIndex.from_columns([encode(values) for values in rows.values()], 500)
+    for query in QUERIES:
+        np.testing.assert_array_equal(index.search(query), _naive(rows, query), err_msg=query)
+
+
+def test_other_gram_sizes():
+    rows = _rows(200)
+    for n in (1, 2, 4):
+        index = NGramIndex.from_columns([encode(values) for values in rows.values()], 200, n)
+        for query in QUERIES:
+            np.testing.assert_array_equal(
+                index.search(query), _naive(rows, query), err_msg=f"{n}: {query}"
+            )
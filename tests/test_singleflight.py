@@ -0,0 +1,100 @@
+"""Single-flight de ``cached_fetch`` (backend/singleflight.py y backend/cache.py)."""
+
+import asyncio
+import contextlib
+
+from asyncpg import Pool
+
+from nuevo_intento.backend.cache import cached_fetch, make_key, query_cache, single_flight
+
+
+class FakeConnection:
+    """Cuenta las consultas y las retiene hasta que ``release`` se activa."""
+
+    def __init__(self):
+        self.queries = 0
+        self.release = asyncio.Event()
+
+    async def fetch(self, query: str, *args) -> list[dict]:
+        self.queries += 1
+        await self.release.wait()
+        return [{"query": query, "args": list(args)}]
+
+
+class FakePool(Pool):
+    """Lo que usa ``cached_fetch`` de un pool de asyncpg."""
+
+    def __init__(self, conn: FakeConnection):
+        self.conn = conn
+
+    def acquire(self):
+        @contextlib.asynccontextmanager
+        async def connection():
+            yield self.conn
+
+        return connection()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_calls_run_the_query_once():
+    async def run():
+        await query_cache.invalidate()
+        conn = FakeConnection()
+        pool = FakePool(conn)
+        calls = [
+            asyncio.create_task(cached_fetch(pool, "SELECT 'singleflight'", 1))
+            for _ in range(20)
+        ]
+        await _settle()
+        assert len(single_flight) == 1
+        conn.release.set()
+        results = await asyncio.gather(*calls)
+        assert conn.queries == 1
+        assert all(result == [{"query": "SELECT 'singleflight'", "args": [1]}] for result in results)
+        assert len(single_flight) == 0
+
+    asyncio.run(run())
+
+
+def test_cancelling_one_waiter_keeps_the_shared_fetch():
+    async def run():
+        await query_cache.invalidate()
+        conn = FakeConnection()
+        pool = FakePool(conn)
+        calls = [
+            asyncio.create_task(cached_fetch(pool, "SELECT 'cancelado'", 2))
+            for _ in range(3)
+        ]
+        await _settle()
+        calls[0].cancel()
+        await _settle()
+        assert calls[0].cancelled() and len(single_flight) == 1
+
+        conn.release.set()
+        results = await asyncio.gather(*calls[1:])
+        assert conn.queries == 1
+        assert results[0] == results[1] == [{"query": "SELECT 'cancelado'", "args": [2]}]
+
+    asyncio.run(run())
+
+
+def test_cancelling_every_waiter_cancels_the_fetch():
+    async def run():
+        await query_cache.invalidate()
+        conn = FakeConnection()
+        calls = [
+            asyncio.create_task(cached_fetch(FakePool(conn), "SELECT 'todos'"))
+            for _ in range(2)
+        ]
+        await _settle()
+        for call in calls:
+            call.cancel()
+        await _settle()
+        assert len(single_flight) == 0
+        assert (await query_cache.get(make_key("SELECT 'todos'", ())))[0] is False
+
+    asyncio.run(run())
@@ -0,0 +1,90 @@
+"""Lectura del snapshot de la tabla (backend/table_state.py) con un cursor falso."""
+
+import asyncio
+import contextlib
+
+from nuevo_intento.backend import table_state
+
+ROW = {
+    "order_id": "o1", "order_item_id": 1, "price": 10.0, "freight_value": 2.0,
+    "total": 12.0, "customer_city": "são paulo", "customer_state": "SP",
+    "seller_city": "curitiba", "seller_state": "PR", "product_category_name": "beleza_saude",
+    "product_weight_g": 300, "status": "delivered", "status_group": "entregado",
+    "purchase_date": "2018-01-02", "year": 2018, "month": 1, "month_name": "Enero",
+}
+
+
+class FakeCursor:
+    """Devuelve ``limit`` filas por lotes y cuenta los fetch."""
+
+    def __init__(self, limit: int):
+        self.remaining = limit
+        self.fetches = 0
+
+    async def fetch(self, n: int) -> list[dict]:
+        await asyncio.sleep(0)
+        self.fetches += 1
+        n = min(n, self.remaining)
+        self.remaining -= n
+        return [ROW] * n
+
+
+class _AsyncNull:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cursors: list[FakeCursor] = []
+
+    def transaction(self, readonly: bool = False):
+        return _AsyncNull()
+
+    async def cursor(self, sql: str, limit: int) -> FakeCursor:
+        self.cursors.append(FakeCursor(limit))
+        return self.cursors[-1]
+
+
+def _patch(monkeypatch, conn: FakeConnection, limit: int):
+    async def get_pool():
+        return None
+
+    @contextlib.asynccontextmanager
+    async def acquire(pool):
+        yield conn
+
+    monkeypatch.setattr(table_state, "get_pool", get_pool)
+    monkeypatch.setattr(table_state, "acquire", acquire)
+    monkeypatch.setattr(table_state, "SNAPSHOT_LIMIT", limit)
+    monkeypatch.setattr(table_state, "SNAPSHOT_BATCH", 500)
+
+
+def test_first_page_does_not_wait_for_the_whole_snapshot(monkeypatch):
+    async def run(limit: int) -> tuple[int, int, int]:
+        conn = FakeConnection()
+        _patch(monkeypatch, conn, limit)
+        load = table_state._SnapshotLoad()
+        first = await load.first
+        fetched_before_first = conn.cursors[0].fetches
+        snapshot = await load.task
+        return fetched_before_first, len(first.rows), len(snapshot.rows)
+
+    # El primer lote llega tras un solo fetch sea cual sea SNAPSHOT_LIMIT.
+    for limit in (2_000, 10_000, 50_000):
+        assert asyncio.run(run(limit)) == (1, 500, limit)
+
+
+def test_small_snapshot_is_published_once(monkeypatch):
+    async def run():
+        _patch(monkeypatch, FakeConnection(), 300)
+        load = table_state._SnapshotLoad()
+        assert await load.first is None
+        snapshot = await load.task
+        assert len(snapshot.rows) == 300 and snapshot.search_index is not None
+        assert table_state._fresh_snapshot() is snapshot
+
+    asyncio.run(run())